@@ -0,0 +1,273 @@
+""" =============================================================================================
+USBSimBench
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Benchmarks for the USBSimDevice hot loop, run against simulated devices (USBSimBackend) and a
+SimConnect stand-in (USBSimStandin), so no hardware or MSFS is needed.
+
+    python benchmarks/USBSimBench.py                       run all benchmarks
+    python benchmarks/USBSimBench.py --quick -k loop       short run of the loop benchmarks only
+    python benchmarks/USBSimBench.py --save base.json      save results as baseline
+    python benchmarks/USBSimBench.py --compare base.json   compare with a saved baseline
+
+Micro benchmarks report calls per second. Loop benchmarks drive a main.py style loop and report
+polls per second, p50/p99 latency from a report becoming available to the event being sent,
+and CPU time per device.
+=============================================================================================="""
+
+import argparse
+import json
+import os
+import random
+import sys
+from time import monotonic, perf_counter, process_time, sleep
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from USBSimDevice import USBSimDevice, METH, IO, BLINK
+from USBSimBackend import FakeBackend, FakeDevice
+from USBSimStandin import StandinSimConnect
+
+# Report bytes holding the sequence number of generated reports, used for latency measurement
+SEQ_BYTE = 60
+
+
+class StampedDevice(FakeDevice):
+    """Fake device writing a sequence number into every report and remembering when it became available.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.due = {}
+        self.seq = 0
+
+    def take(self, now):
+        due = self._due
+        report = super().take(now)
+        if report is not None:
+            self.seq = (self.seq + 1) & 0xffff
+            report[SEQ_BYTE] = self.seq >> 8
+            report[SEQ_BYTE + 1] = self.seq & 0xff
+            self.due[self.seq] = due if due is not None else now
+        return report
+
+
+def make_ios(count):
+    """Returns count single bit inputs/outputs starting at byte 0.
+    """
+    return [IO(f"IO{i}", i // 8, i % 8) for i in range(count)]
+
+
+def new_device(backend, n, method, rate=100.0, ios=8, device_class=FakeDevice):
+    """Adds a fake device to the backend and creates the USBSimDevice for it.
+    """
+    fake = backend.add(device_class(0x1234, 0x1000 + n, rate=rate, random_bytes=range(max(1, ios // 8)), seed=n))
+    USBSimDevice.enumerate(force=True)
+    dev = USBSimDevice(fake.vendor_id, fake.product_id, 0, method, state=dict(fake=fake))
+    return fake, dev
+
+
+def reset():
+    """Forgets all devices of a previous benchmark.
+    """
+    USBSimDevice.Workers.clear()
+    USBSimDevice._enum_time = None
+    USBSimDevice.Backend = FakeBackend()
+    return USBSimDevice.Backend
+
+
+def timeit(fn, duration):
+    """Calls fn repeatedly for about duration seconds and returns calls per second.
+    """
+    calls, batch = 0, 16
+    start = perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = perf_counter() - start
+        if elapsed >= duration:
+            return calls / elapsed
+        batch = min(batch * 2, 4096)
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def bench_input(duration):
+    """input() and input_ios() for several IO counts and fractions of changed bits.
+    """
+    results = {}
+    for ios in (8, 64, 256):
+        for fraction in (0.0, 0.1, 1.0):
+            reset()
+            _, dev = new_device(USBSimDevice.Backend, 0, METH.READ, ios=ios)
+            dev.set_inputs(make_ios(ios))
+            rnd = random.Random(ios)
+            old = bytes(64)
+            bits = [i for i in range(ios) if rnd.random() < fraction]
+            new = bytearray(64)
+            for i in bits:
+                new[i // 8] |= 1 << (i % 8)
+            dev.old_readbuffer, dev.readbuffer = old, list(new)
+            results[f"input_ios ios={ios} changed={fraction}"] = {"calls/s": timeit(dev.input_ios, duration)}
+            if fraction == 1.0:
+                results[f"input ios={ios}"] = {"calls/s": timeit(dev.input, duration)}
+    return results
+
+
+def bench_output(duration):
+    """output_io(), output_ios() and blink_apply() for several IO counts.
+    """
+    results = {}
+    for ios in (8, 64, 256):
+        reset()
+        _, dev = new_device(USBSimDevice.Backend, 0, METH.WRITE, ios=ios)
+        dev.set_outputs(make_ios(ios))
+        names = [f"IO{i}" for i in range(ios)]
+        values = {name: 1 for name in names}
+        state = [0]
+
+        def single():
+            state[0] ^= 1
+            for name in names:
+                dev.output_io(name, state[0])
+
+        def bulk():
+            state[0] ^= 1
+            for name in values:
+                values[name] = state[0]
+            dev.output_ios(values)
+
+        results[f"output_io x{ios}"] = {"calls/s": timeit(single, duration)}
+        results[f"output_ios x{ios}"] = {"calls/s": timeit(bulk, duration)}
+        for i, name in enumerate(names[::2]):
+            dev.blink_on(name, 0, (BLINK.SLOW, BLINK.FAST, BLINK.DOUBLE)[i % 3])
+        buffer = dev.writebuffer
+        results[f"blink_apply blinkers={len(dev.blinkers)}"] = {"calls/s": timeit(lambda: dev.blink_apply(buffer), duration)}
+    return results
+
+
+def bench_update(duration):
+    """update() on a connected fake device, idle and with reports at every call.
+    """
+    results = {}
+    for label, rate in (("idle", None), ("busy", 1e9)):
+        reset()
+        fake, dev = new_device(USBSimDevice.Backend, 0, METH.READ | METH.WRITE, rate=rate, ios=64)
+        dev.set_inputs(make_ios(64))
+        dev.set_outputs(make_ios(8))
+        results[f"update {label}"] = {"calls/s": timeit(dev.update, duration)}
+    return results
+
+
+def run_loop(devices, rate, ios, duration):
+    """Runs a main.py style loop (receive, 5 x update/actions, 1 ms sleep) against fake devices.
+    """
+    backend = reset()
+    sc = StandinSimConnect()
+    simvars = sc.subscribe_simdata([])
+    latencies = []
+    fakes = []
+
+    def action(self):
+        ins = self.input_ios()
+        for name, value in ins.items():
+            if value is not False:
+                sc.send_event('EVENT', value)
+                seq = (self.readbuffer[SEQ_BYTE] << 8) | self.readbuffer[SEQ_BYTE + 1]
+                due = self.state.fake.due.pop(seq, None)
+                if due is not None:
+                    latencies.append(monotonic() - due)
+                break
+
+    for n in range(devices):
+        fake, dev = new_device(backend, n, METH.READ, rate=rate, ios=ios, device_class=StampedDevice)
+        dev.set_inputs(make_ios(ios))
+        dev.set_actions(action)
+        fakes.append(fake)
+    polls = 0
+    cpu = process_time()
+    start = monotonic()
+    while monotonic() - start < duration:
+        sc.receive(timeout_seconds=0)
+        simvars.simdata.changedsince(simvars.simdata.latest())
+        for i in range(5):
+            for worker in USBSimDevice.Workers:
+                worker.update()
+                worker.actions()
+                polls += 1
+            sleep(0.001)
+    elapsed = monotonic() - start
+    cpu = process_time() - cpu
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    return {"polls/s": polls / elapsed, "events/s": sum(sc.counts.values()) / elapsed,
+            "p50 ms": None if p50 is None else p50 * 1000, "p99 ms": None if p99 is None else p99 * 1000,
+            "cpu ms/s/device": cpu / elapsed / devices * 1000}
+
+
+def bench_loop(duration):
+    """Full loop for several device counts, report rates and IO counts.
+    """
+    results = {}
+    for devices in (1, 4, 16):
+        for rate in (50.0, 500.0):
+            results[f"loop devices={devices} rate={rate:g}"] = run_loop(devices, rate, 32, duration)
+    for ios in (8, 128):
+        results[f"loop devices=4 rate=500 ios={ios}"] = run_loop(4, 500.0, ios, duration)
+    return results
+
+
+BENCHMARKS = {"input": bench_input, "output": bench_output, "update": bench_update, "loop": bench_loop}
+
+# Metrics where a higher value is better, all others are better when lower
+HIGHER_IS_BETTER = ("calls/s", "polls/s", "events/s")
+
+
+def compare(results, baseline, tolerance):
+    """Prints results next to a baseline and returns the number of regressions beyond tolerance.
+    """
+    regressions = 0
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if value is None or not base:
+                continue
+            ratio = value / base
+            worse = ratio < 1 - tolerance if metric in HIGHER_IS_BETTER else ratio > 1 + tolerance
+            regressions += worse
+            print(f"{name:45} {metric:16} {value:14.3f} {base:14.3f} {ratio:7.2f}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='USBSimBench')
+    parser.add_argument('-k', dest='select', action='append', choices=sorted(BENCHMARKS), help='Run only these benchmarks')
+    parser.add_argument('--quick', action='store_true', help='Short runs, for smoke testing')
+    parser.add_argument('--save', metavar='FILE', help='Save results as JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='Compare results with a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Relative change reported as regression')
+    args = parser.parse_args(argv)
+    micro, loop = (0.05, 0.3) if args.quick else (0.5, 2.0)
+    results = {}
+    for name in args.select or BENCHMARKS:
+        results.update(BENCHMARKS[name](loop if name == 'loop' else micro))
+    for name, metrics in results.items():
+        print(f"{name:45} " + "  ".join(f"{k} {v:.3f}" for k, v in metrics.items() if v is not None))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+""" =============================================================================================
+USBSimAsync
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+v1.1 / 16.10.2026 Events flushed after the actions
+
+asyncio front end for USBSimDevice as an alternative to a hand written main loop. Every device
+in USBSimDevice.Workers is driven by its own task, woken up by reports of its reader thread or
+by simvar changes instead of being polled at a fixed cadence.
+=============================================================================================="""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from USBSimDevice import USBSimDevice, METH
+import USBSimTrace
+
+
+class Pulse:
+    """Awaitable notification, every call of fire() wakes up all coroutines currently waiting in wait().
+    """
+    def __init__(self):
+        self._future = None
+
+    async def wait(self):
+        """Waits for the next fire() and returns its value.
+        """
+        if self._future is None:
+            self._future = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(self._future)
+
+    def fire(self, value=None):
+        """Wakes up all waiting coroutines.
+
+        Args:
+            value: value returned by wait()
+        """
+        if self._future is not None:
+            self._future.set_result(value)
+            self._future = None
+
+
+class AsyncScheduler:
+    """Drives all USBSimDevice workers and the SimConnect client from one asyncio event loop.
+
+    Devices are switched to threaded mode, so input reports arrive through their reader threads. update() runs in an
+    executor, keeping slow writes (i.e. feature reports) off the event loop. actions() runs on the event loop whenever
+    a device received a report or one of its simvars changed. Additional coroutines can await input_changed() or
+    simvars_changed(). If sc batches events like USBSimEvents.EventDispatcher, it is flushed once the actions woken up
+    together have run, and after on_frame.
+    """
+    def __init__(self, sc=None, simvars=None, workers=None, period=0.01, executor=None, on_frame=None):
+        """
+        Args:
+            sc (SimConnect): connected SimConnect client, optional
+            simvars: subscription returned by sc.subscribe_simdata, optional
+            workers (list): devices to drive, defaults to USBSimDevice.Workers
+            period (float): interval in seconds for SimConnect polling and for idle device updates (blinking, reconnect)
+            executor (Executor): executor for HID I/O, defaults to a thread pool with one thread per device
+            on_frame (callable): called with the set of changed simvars for every SimConnect frame, before any actions,
+                events it sends are flushed right after
+        """
+        self.sc = sc
+        self.simvars = simvars
+        self.workers = list(USBSimDevice.Workers if workers is None else workers)
+        self.period = period
+        self.executor = executor
+        self.on_frame = on_frame
+        self.simvarsChanged = False
+        self._inputs = {worker: Pulse() for worker in self.workers}
+        self._wake = {}
+        self._simvar_pulse = Pulse()
+        self._tasks = []
+        self._flush_pending = False
+
+    async def input_changed(self, worker):
+        """Waits until the device has received a new input report.
+
+        Args:
+            worker (USBSimDevice): device to wait for
+        Returns:
+            dict: result of worker.input_ios() for the new report
+        """
+        await self._inputs[worker].wait()
+        return worker.input_ios()
+
+    async def simvars_changed(self):
+        """Waits until SimConnect has delivered changed simvars.
+
+        Returns:
+            set: names of the changed simvars
+        """
+        return await self._simvar_pulse.wait()
+
+    def create_task(self, coro):
+        """Runs an additional coroutine, i.e. an async action, together with the scheduler.
+
+        Args:
+            coro (coroutine): coroutine to be run
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.append(task)
+        return task
+
+    def _flush_soon(self):
+        """Flushes the events of sc once the callbacks ready on the event loop have run, so the events of all actions
+        woken up together are sent in one batch.
+        """
+        if not self._flush_pending and hasattr(self.sc, "flush"):
+            self._flush_pending = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        self.sc.flush()
+
+    async def _drive(self, worker):
+        """Task for one device: update in the executor, then run actions if there was input or a simvar change.
+        """
+        loop = asyncio.get_running_loop()
+        wake = self._wake[worker]
+        pulse = self._inputs[worker]
+        worker.on_report = lambda: loop.call_soon_threadsafe(wake.set)
+        if not worker.threaded:
+            # reconnect in threaded mode at the next update
+            worker.threaded = True
+            if worker.method & (METH.READ | METH.READ_LAST | METH.READ_ALL):
+                worker.stop()
+        while True:
+            try:
+                await asyncio.wait_for(wake.wait(), self.period)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            await loop.run_in_executor(self.executor, worker.update)
+            if worker.readbuffer is not worker.old_readbuffer:
+                pulse.fire()
+            if worker.triggered():
+                if USBSimTrace.tracer is not None:
+                    # the update reset the origin of the executor thread, reset it for the actions of this task
+                    USBSimTrace.tracer.origin = None
+                worker.actions()
+                self._flush_soon()
+                if worker.writeUpdate or worker.pending_work()[0]:
+                    # flush outputs and pending reports right away
+                    wake.set()
+
+    async def _receive(self):
+        """Task polling SimConnect once per period and waking up the devices concerned by simvar changes.
+        """
+        while True:
+            latest = self.simvars.simdata.latest()
+            try:
+                self.sc.receive(timeout_seconds=0)
+            except Exception:
+                pass
+            changed = set(self.simvars.simdata.changedsince(latest))
+            self.simvarsChanged = bool(changed)
+            if self.on_frame is not None:
+                self.on_frame(changed)
+                self._flush_soon()
+            if changed:
+                self._simvar_pulse.fire(changed)
+                # wake only the devices using one of the changed simvars
+                for worker in USBSimDevice.dispatch_simvars(changed):
+                    wake = self._wake.get(worker)
+                    if wake is not None:
+                        wake.set()
+            await asyncio.sleep(self.period)
+
+    async def run(self):
+        """Runs all device tasks and the SimConnect task until cancelled.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.workers)), thread_name_prefix="USBSimDevice")
+        self._wake = {worker: asyncio.Event() for worker in self.workers}
+        self._tasks.extend(asyncio.create_task(self._drive(worker)) for worker in self.workers)
+        if self.sc is not None and self.simvars is not None:
+            self._tasks.append(asyncio.create_task(self._receive()))
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            for worker in self.workers:
+                worker.on_report = None
+            self.executor.shutdown(wait=False)
+
+
+def run(sc=None, simvars=None, **kwargs):
+    """Blocking entry point, runs an AsyncScheduler for all USBSimDevice.Workers in a new event loop.
+
+    Args:
+        sc (SimConnect): connected SimConnect client
+        simvars: subscription returned by sc.subscribe_simdata
+        kwargs: further arguments of AsyncScheduler
+    """
+    asyncio.run(AsyncScheduler(sc, simvars, **kwargs).run())
@@ -0,0 +1,121 @@
+""" =============================================================================================
+USBSimAxis
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Processing of analog inputs: calibration, smoothing, deadband, scaling to the range of an axis
+event and suppression of negligible changes. An Axis is attached to an input as the fourth
+field of its IO, input_ios() then reports the processed value, or False when there is nothing
+worth sending.
+
+    device.set_inputs([IO("DU", 0, 16, Axis(400, 600, calibrate=15, threshold=64))])
+=============================================================================================="""
+
+from collections import deque
+from time import monotonic
+
+
+class Axis:
+    """Processing stage of one analog input. Raw values pass through calibration, median filter, exponential moving
+    average, normalisation to -1..1, deadband and scaling to out_min..out_max. A value is emitted only if it differs
+    from the last emitted one by at least threshold, or reaches the center or one of the ends of the output range.
+
+    An instance keeps the state of one input and must not be shared between inputs.
+    """
+    def __init__(self, low=None, high=None, out_min=-16383, out_max=16383, calibrate=False, median=1, ema=None,
+                 deadband=0.0, threshold=0, invert=False):
+        """
+        Args:
+            low (int): raw value mapped to out_min, defaults to the lowest value of the input
+            high (int): raw value mapped to out_max, defaults to the highest value of the input
+            out_min (int): lowest output value
+            out_max (int): highest output value
+            calibrate (bool or float): widen low and high to the raw values seen, True for ever or during the given
+                number of seconds from the first value
+            median (int): window of the median filter, 1 switches it off
+            ema (float): weight of a new value in the exponential moving average, None switches it off
+            deadband (float): part of each half of the range around the center mapped to the center, 0..1
+            threshold (int): minimum change of the output value to be emitted
+            invert (bool): map low to out_max and high to out_min
+        """
+        self.low = low
+        self.high = high
+        self.out_min = out_min
+        self.out_max = out_max
+        self.calibrate = calibrate
+        self.ema = ema
+        self.deadband = deadband
+        self.threshold = threshold
+        self.invert = invert
+        self._window = deque(maxlen=median) if median > 1 else None
+        self._calibrate_until = None
+        self._average = None
+        self.value = None
+
+    def default_range(self, low, high):
+        """Sets low and high to the range of the input where they were not given, called by set_inputs().
+        """
+        if self.low is None:
+            self.low = low
+        if self.high is None:
+            self.high = high
+
+    @property
+    def calibrating(self):
+        """True while low and high are still adjusted to the raw values.
+        """
+        if self.calibrate is True:
+            return True
+        if not self.calibrate:
+            return False
+        return self._calibrate_until is None or monotonic() < self._calibrate_until
+
+    def reset(self):
+        """Forgets filter state and the last emitted value, i.e. after reconnecting the device.
+        """
+        if self._window is not None:
+            self._window.clear()
+        self._average = None
+        self.value = None
+
+    def process(self, raw):
+        """Processes one raw value.
+
+        Args:
+            raw (int): value read from the input
+        Returns:
+            int: new output value, None if the change is below threshold
+        """
+        if self.calibrate:
+            if self._calibrate_until is None and self.calibrate is not True:
+                self._calibrate_until = monotonic() + self.calibrate
+            if self.calibrating:
+                if raw < self.low:
+                    self.low = raw
+                elif raw > self.high:
+                    self.high = raw
+        x = raw
+        if self._window is not None:
+            self._window.append(raw)
+            x = sorted(self._window)[len(self._window) // 2]
+        if self.ema is not None:
+            x = x if self._average is None else self._average + self.ema * (x - self._average)
+            self._average = x
+        span = self.high - self.low
+        # normalise to -1..1
+        x = min(max((2 * (x - self.low) / span - 1) if span else 0.0, -1.0), 1.0)
+        if self.invert:
+            x = -x
+        if self.deadband:
+            magnitude = abs(x) - self.deadband
+            x = 0.0 if magnitude <= 0 else (magnitude / (1 - self.deadband) if x > 0 else -magnitude / (1 - self.deadband))
+        value = int(round(self.out_min + (x + 1) / 2 * (self.out_max - self.out_min)))
+        last = self.value
+        if last is not None:
+            if value == last:
+                return None
+            # small changes are dropped, except reaching the center or the ends so the axis can settle there
+            if abs(value - last) < self.threshold and x not in (-1.0, 0.0, 1.0):
+                return None
+        self.value = value
+        return value
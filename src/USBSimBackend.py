@@ -0,0 +1,439 @@
+""" =============================================================================================
+USBSimBackend
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Backends that can replace the hid module for USBSimDevice, set via USBSimDevice.Backend:
+ - FakeBackend: simulated devices emitting scripted or random reports at a given rate
+ - RecordingBackend: wraps a real backend and records all reports and writes to a file
+ - ReplayBackend: plays a recorded session back in real time or at maximum speed
+
+A backend provides enumerate(vendor_id, product_id) and device() just like the hid module.
+=============================================================================================="""
+
+import random
+import struct
+import threading
+from collections import deque
+from time import monotonic
+
+# Record kinds of the session file
+REC_DEVICE = 0
+REC_READ = 1
+REC_WRITE = 2
+REC_FEATURE_READ = 3
+REC_FEATURE_WRITE = 4
+
+# Session file: magic, then records of header (time in µs, device, kind, length, stored length) and data.
+# Trailing zeros of the data are not stored.
+MAGIC = b'USBSIMR1'
+RECORD = struct.Struct('<QHBHH')
+DEVICE = struct.Struct('<HHb')
+
+
+class FakeDevice:
+    """A simulated HID device. Reports are taken from push(), from a list of scripted reports or generated by flipping
+    random bits, one report every 1/rate seconds.
+    """
+    def __init__(self, vendor_id, product_id, interface=0, reports=None, rate=100.0, loop=True, random_bytes=(),
+                 length=64, seed=None, path=None):
+        """
+        Args:
+            vendor_id (int): USB vendor ID reported by enumerate
+            product_id (int): USB product ID reported by enumerate
+            interface (int): USB interface reported by enumerate
+            reports (list): scripted reports to emit in turn, None for random reports
+            rate (float): reports per second, None emits pushed reports only
+            loop (bool): start over when all scripted reports have been emitted
+            random_bytes (iterable): byte positions in which random reports flip one bit each
+            length (int): length of random reports
+            seed (int): seed for random reports, for reproducible sessions
+            path (bytes): path reported by enumerate, defaults to a unique fake path
+        """
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.interface = interface
+        self.path = path
+        self.reports = list(reports) if reports is not None else None
+        self.rate = rate
+        self.loop = loop
+        self.random_bytes = tuple(random_bytes)
+        self.connected = True
+        self.writes = []
+        self.feature = [0] * length
+        self._last = [0] * length
+        self._random = random.Random(seed)
+        self._pushed = deque()
+        self._index = 0
+        self._due = None
+        self._cond = threading.Condition()
+
+    def info(self):
+        """Returns the enumeration entry of the device in the format of hid.enumerate.
+        """
+        return {"vendor_id": self.vendor_id, "product_id": self.product_id, "interface_number": self.interface,
+                "path": self.path, "product_string": "USBSimDevice fake", "manufacturer_string": "", "serial_number": ""}
+
+    def push(self, report):
+        """Queues a report to be read next, regardless of the rate.
+        """
+        with self._cond:
+            self._pushed.append(list(report))
+            self._cond.notify_all()
+
+    def unplug(self):
+        """Simulates removing the device, open handles fail at their next access.
+        """
+        with self._cond:
+            self.connected = False
+            self._cond.notify_all()
+
+    def plug(self):
+        """Simulates plugging the device back in.
+        """
+        self.connected = True
+
+    def _generate(self):
+        """Returns the next scripted or random report, None when the script is exhausted.
+        """
+        if self.reports is not None:
+            if self._index >= len(self.reports):
+                if not self.loop or not self.reports:
+                    return None
+                self._index = 0
+            report = self.reports[self._index]
+            self._index += 1
+            return list(report)
+        report = self._last.copy()
+        if self.random_bytes:
+            byte = self._random.choice(self.random_bytes)
+            report[byte] ^= 1 << self._random.randrange(8)
+        return report
+
+    def next_due(self, now):
+        """Returns the time the next report is available, None if no more reports will come.
+        """
+        if self._pushed:
+            return now
+        if self.rate is None:
+            return None
+        if self._due is None:
+            self._due = now
+        return self._due
+
+    def take_feature(self, now):
+        """Returns the current feature report.
+        """
+        return self.feature
+
+    def take(self, now):
+        """Returns the next report if it is due, otherwise None.
+        """
+        if self._pushed:
+            return self._pushed.popleft()
+        due = self.next_due(now)
+        if due is None or due > now:
+            return None
+        report = self._generate()
+        if report is None:
+            self.rate = None
+            return None
+        # a real device buffers only a few reports, do not catch up on a long backlog
+        self._due = max(due + 1 / self.rate, now - 32 / self.rate)
+        self._last = report
+        return report
+
+
+class FakeHandle:
+    """hid.device compatible handle for FakeDevice and replayed devices.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.device = None
+        self.nonblocking = False
+
+    def _check(self):
+        if self.device is None or not self.device.connected:
+            raise OSError("device not connected")
+
+    def open_path(self, path):
+        device = self.backend.devices.get(path)
+        if device is None or not device.connected:
+            raise OSError("open failed")
+        self.device = device
+
+    def set_nonblocking(self, nonblocking):
+        self.nonblocking = bool(nonblocking)
+        return 0
+
+    def read(self, max_length, timeout_ms=0):
+        self._check()
+        device = self.device
+        now = monotonic()
+        if timeout_ms > 0:
+            deadline = now + timeout_ms / 1000
+        elif self.nonblocking:
+            deadline = now
+        else:
+            deadline = None
+        with device._cond:
+            while True:
+                report = device.take(now)
+                if report is not None:
+                    return report[:max_length]
+                due = device.next_due(now)
+                wake = due if deadline is None or (due is not None and due < deadline) else deadline
+                if wake is not None and wake <= now:
+                    return []
+                device._cond.wait(None if wake is None else wake - now)
+                self._check()
+                now = monotonic()
+
+    def get_feature_report(self, report_id, max_length):
+        self._check()
+        return list(self.device.take_feature(monotonic())[:max_length])
+
+    def write(self, buff):
+        self._check()
+        self.device.writes.append((monotonic(), REC_WRITE, bytes(buff)))
+        return len(buff)
+
+    def send_feature_report(self, buff):
+        self._check()
+        self.device.writes.append((monotonic(), REC_FEATURE_WRITE, bytes(buff)))
+        return len(buff)
+
+    def close(self):
+        self.device = None
+
+
+class FakeBackend:
+    """Backend with simulated devices only.
+
+    Example:
+        backend = FakeBackend()
+        backend.add(FakeDevice(0x06a3, 0x0d06, random_bytes=(0, 1, 2), rate=200))
+        USBSimDevice.Backend = backend
+    """
+    def __init__(self):
+        self.devices = {}
+
+    def add(self, device):
+        """Adds a FakeDevice, which is then listed by enumerate.
+        """
+        if device.path is None:
+            device.path = b'fake:%04x:%04x:%d:%d' % (device.vendor_id, device.product_id, device.interface, len(self.devices))
+        self.devices[device.path] = device
+        return device
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        return [d.info() for d in self.devices.values() if d.connected
+                and (vendor_id == 0 or d.vendor_id == vendor_id) and (product_id == 0 or d.product_id == product_id)]
+
+    def device(self):
+        return FakeHandle(self)
+
+
+class Recorder:
+    """Writes timestamped session records to a binary file.
+    """
+    def __init__(self, file):
+        """
+        Args:
+            file (str or file): file name or binary file object opened for writing
+        """
+        self.file = open(file, 'wb') if isinstance(file, str) else file
+        self.file.write(MAGIC)
+        self.start = monotonic()
+        self.paths = {}
+        self.lock = threading.Lock()
+
+    def register(self, info):
+        """Returns the device number for an enumeration entry, recording the device on first use.
+        """
+        path = info["path"]
+        if path not in self.paths:
+            self.paths[path] = len(self.paths)
+            data = DEVICE.pack(info["vendor_id"], info["product_id"], info["interface_number"]) + bytes(path)
+            self.record(self.paths[path], REC_DEVICE, data)
+        return self.paths[path]
+
+    def record(self, device, kind, data):
+        data = bytes(data)
+        stored = data.rstrip(b'\0')
+        with self.lock:
+            self.file.write(RECORD.pack(int((monotonic() - self.start) * 1e6), device, kind, len(data), len(stored)))
+            self.file.write(stored)
+
+    def close(self):
+        self.file.close()
+
+
+class RecordingHandle:
+    """Handle passing all calls to a real handle, recording reports and writes.
+    """
+    def __init__(self, backend, handle):
+        self.backend = backend
+        self.handle = handle
+        self.number = None
+
+    def open_path(self, path):
+        self.handle.open_path(path)
+        info = self.backend.infos.get(path, {"vendor_id": 0, "product_id": 0, "interface_number": -1, "path": path})
+        self.number = self.backend.recorder.register(info)
+
+    def set_nonblocking(self, nonblocking):
+        return self.handle.set_nonblocking(nonblocking)
+
+    def read(self, max_length, timeout_ms=0):
+        red = self.handle.read(max_length, timeout_ms)
+        if red:
+            self.backend.recorder.record(self.number, REC_READ, red)
+        return red
+
+    def get_feature_report(self, report_id, max_length):
+        red = self.handle.get_feature_report(report_id, max_length)
+        self.backend.recorder.record(self.number, REC_FEATURE_READ, red)
+        return red
+
+    def write(self, buff):
+        self.backend.recorder.record(self.number, REC_WRITE, buff)
+        return self.handle.write(buff)
+
+    def send_feature_report(self, buff):
+        self.backend.recorder.record(self.number, REC_FEATURE_WRITE, buff)
+        return self.handle.send_feature_report(buff)
+
+    def close(self):
+        self.handle.close()
+
+
+class RecordingBackend:
+    """Backend wrapping another one (usually hid) and recording the session of all opened devices.
+
+    Example:
+        import hid
+        USBSimDevice.Backend = RecordingBackend(hid, "session.usbsim")
+    """
+    def __init__(self, backend, file):
+        self.backend = backend
+        self.recorder = Recorder(file)
+        self.infos = {}
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        devices = self.backend.enumerate(vendor_id, product_id)
+        for d in devices:
+            self.infos[d["path"]] = d
+        return devices
+
+    def device(self):
+        return RecordingHandle(self, self.backend.device())
+
+    def close(self):
+        self.recorder.close()
+
+
+def read_session(file):
+    """Reads a recorded session.
+
+    Args:
+        file (str or file): file name or binary file object
+    Returns:
+        (list, list): device enumeration entries and records (time in s, device number, kind, data)
+    """
+    f = open(file, 'rb') if isinstance(file, str) else file
+    with f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a USBSimDevice session file")
+        devices, records = [], []
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            t, device, kind, length, stored = RECORD.unpack(header)
+            data = f.read(stored) + bytes(length - stored)
+            if kind == REC_DEVICE:
+                vendor_id, product_id, interface = DEVICE.unpack_from(data)
+                devices.append({"vendor_id": vendor_id, "product_id": product_id, "interface_number": interface,
+                                "path": data[DEVICE.size:], "product_string": "USBSimDevice replay",
+                                "manufacturer_string": "", "serial_number": ""})
+            else:
+                records.append((t / 1e6, device, kind, data))
+    return devices, records
+
+
+class ReplayDevice(FakeDevice):
+    """Device playing back the reads of a recorded session, feature reports included.
+    """
+    def __init__(self, backend, info, reads, features):
+        super().__init__(info["vendor_id"], info["product_id"], info["interface_number"], rate=None,
+                         path=info["path"])
+        self.backend = backend
+        self.reads = deque(reads)
+        self.features = deque(features)
+
+    def info(self):
+        return dict(self.backend.infos[self.path])
+
+    def _time(self, t):
+        # session time -> monotonic time, everything is due at maximum speed
+        if self.backend.speed is None:
+            return float('-inf')
+        return self.backend.start + t / self.backend.speed
+
+    def next_due(self, now):
+        if self._pushed:
+            return now
+        if not self.reads:
+            return None
+        return self._time(self.reads[0][0])
+
+    def take(self, now):
+        if self._pushed:
+            return self._pushed.popleft()
+        if self.reads and self._time(self.reads[0][0]) <= now:
+            return list(self.reads.popleft()[1])
+        return None
+
+    def take_feature(self, now):
+        if self.backend.speed is None:
+            # one recorded feature report per call
+            if self.features:
+                self.feature = list(self.features.popleft()[1])
+        else:
+            while self.features and self._time(self.features[0][0]) <= now:
+                self.feature = list(self.features.popleft()[1])
+        return self.feature
+
+
+class ReplayBackend(FakeBackend):
+    """Backend replaying a session recorded by RecordingBackend. Writes of the replay are collected in the writes list
+    of each device and can be compared with the recorded ones in recorded_writes.
+
+    Example:
+        USBSimDevice.Backend = ReplayBackend("session.usbsim", speed=None)
+    """
+    def __init__(self, file, speed=1.0):
+        """
+        Args:
+            file (str or file): session file written by RecordingBackend
+            speed (float): replay speed, 1.0 is real time, None replays at maximum speed
+        """
+        super().__init__()
+        self.speed = speed
+        self.start = monotonic()
+        devices, records = read_session(file)
+        self.infos = {d["path"]: d for d in devices}
+        self.recorded_writes = {d["path"]: [] for d in devices}
+        for number, info in enumerate(devices):
+            own = [r for r in records if r[1] == number]
+            reads = [(t, data) for t, _, kind, data in own if kind == REC_READ]
+            features = [(t, data) for t, _, kind, data in own if kind == REC_FEATURE_READ]
+            self.recorded_writes[info["path"]] = [(t, kind, data) for t, _, kind, data in own
+                                                   if kind in (REC_WRITE, REC_FEATURE_WRITE)]
+            self.add(ReplayDevice(self, info, reads, features))
+
+    def restart(self):
+        """Restarts the replay clock, i.e. after all devices have been created.
+        """
+        self.start = monotonic()
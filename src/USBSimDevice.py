@@ -7,14 +7,43 @@ v0.3 / Input signed values using bit=-7
 v0.4 / 30.05.2024 Added docstrings for all methods
 v0.5 / 01.06.2024 Added blinking
 v1.0 / 02.06.2024 Refactor
+v1.1 / 16.10.2026 Compiled input decode plan
+v1.2 / 16.10.2026 Optional threaded mode with blocking reader threads
+v1.3 / 16.10.2026 Shared enumeration cache and reconnect backoff
+v1.4 / 16.10.2026 Skip redundant writes, minimum write interval
+v1.5 / 16.10.2026 Mask based blinking with several patterns, BLINK replaces BLINKTIME
+v1.6 / 16.10.2026 Output name index, bulk output_ios and transactions
+v1.7 / 16.10.2026 Pluggable HID backend
+v1.8 / 16.10.2026 Opt-in runtime metrics
+v1.9 / 16.10.2026 Per device simvar changes
+v1.10 / 16.10.2026 Simvar rate classes
+v1.11 / 16.10.2026 Lossless READ_ALL with report batches
+v1.12 / 16.10.2026 Reads skipped for devices a poller found idle
+v1.13 / 16.10.2026 Axis processing of analog inputs
+v1.14 / 16.10.2026 Poll priority, rate and latency for adaptive scheduling
+v1.15 / 16.10.2026 Optional latency tracing
+v1.16 / 16.10.2026 Display regions with cached rendering
+v1.17 / 16.10.2026 Inputs decoded by USBSimMatrix are taken over by input_ios()
+v1.18 / 16.10.2026 Actions set later stay profiled by USBSimProfiler
+v1.19 / 16.10.2026 Slotted instances with declared user state, preallocated read and write buffers
+v1.20 / 16.10.2026 Hotplug probe on Windows
+v1.21 / 16.10.2026 pending_work() and next_due() for schedulers
 
 Simple python interaction layer for using non-ordinary USB Hid devices with Simconnect (i.e.MSFS)
 =============================================================================================="""
 
-from time import time
+from time import monotonic, monotonic_ns, perf_counter_ns
 import hid
-from collections import namedtuple
-from typing import List
+import ctypes
+import os
+import threading
+import uuid
+from collections import namedtuple, deque
+from contextlib import contextmanager
+from types import MemberDescriptorType
+from typing import List, Dict
+import USBSimMetrics
+import USBSimTrace
 
 # Constants define the method of interaction with USB device
 
@@ -24,10 +53,120 @@ class METH:
     READ_LAST = 4
     WRITE = 8
     WRITE_FEATURE = 16
+    READ_ALL = 32
+
+# Rate classes of simvars, lower values are requested more often. A simvar requested in several classes is
+# subscribed in the lowest one. On change simvars are checked every frame, fast ones every few frames.
+
+class RATE:
+    ONCHANGE = 1
+    FAST = 2
+    NORMAL = 3
+    SLOW = 4
+
+# Poll priorities used by USBSimScheduler, lower values are served first
+
+class PRIO:
+    AXIS = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+# Blink patterns: duration of one step in seconds and the sequence of steps, 1 meaning the output shows its off value
+
+Blink = namedtuple("Blink", "step steps")
+
+class BLINK:
+    SLOW = Blink(0.7, (0, 1))
+    FAST = Blink(0.2, (0, 1))
+    DOUBLE = Blink(0.15, (1, 0, 1, 0, 0, 0))
 
 # Class for definition of Buttons and LEDs
-# Byte valued Buttons or LEDs have bit set to 8
-IO = namedtuple("IO", "name byte bit")
+# Byte valued Buttons or LEDs have bit set to 8, analog inputs can have an USBSimAxis.Axis processing their values
+IO = namedtuple("IO", "name byte bit axis", defaults=(None,))
+
+# Aggregated changes of an input over a batch of reports, see USBSimDevice.input_batch()
+Batch = namedtuple("Batch", "value presses releases delta")
+
+# Returned by changed_simvars() when nothing has changed
+_NO_SIMVARS = frozenset()
+
+# Kinds of input extractors used by the compiled decode plan
+_IN_BIT, _IN_BYTE, _IN_SIGNED, _IN_WORD = 0, 1, 2, 3
+# Raw value range of each kind, the default range of an axis
+_IN_RANGE = {_IN_BIT: (0, 1), _IN_BYTE: (0, 255), _IN_SIGNED: (-128, 127), _IN_WORD: (0, 65535)}
+
+def hidraw_nodes():
+    """Cheap hotplug probe: returns the set of hidraw device nodes on Linux, None where this is not available.
+    """
+    # without the hidraw class, i.e. on macOS, /dev never lists the devices and the bus is enumerated every ENUM_TTL
+    if not os.path.isdir('/sys/class/hidraw'):
+        return None
+    try:
+        return frozenset(n for n in os.listdir('/dev') if n.startswith('hidraw'))
+    except OSError:
+        return None
+
+# Device interface class of HID devices and configuration manager results used by hid_interfaces()
+_GUID_DEVINTERFACE_HID = uuid.UUID('4d1e55b2-f16f-11cf-88cb-001111000030')
+_CR_SUCCESS, _CR_BUFFER_SMALL = 0, 0x1a
+_cfgmgr32 = None
+
+def hid_interfaces():
+    """Cheap hotplug probe: returns the set of present HID device interfaces on Windows, queried from the configuration
+    manager without opening any device, None where this is not available.
+    """
+    global _cfgmgr32
+    if _cfgmgr32 is None:
+        try:
+            _cfgmgr32 = ctypes.WinDLL('cfgmgr32')
+        except (AttributeError, OSError):
+            return None
+    guid = (ctypes.c_ubyte * 16).from_buffer_copy(_GUID_DEVINTERFACE_HID.bytes_le)
+    size = ctypes.c_ulong()
+    # the list can grow between querying its size and reading it
+    for _ in range(3):
+        if _cfgmgr32.CM_Get_Device_Interface_List_SizeW(ctypes.byref(size), guid, None, 0) != _CR_SUCCESS:
+            return None
+        buffer = ctypes.create_unicode_buffer(size.value)
+        result = _cfgmgr32.CM_Get_Device_Interface_ListW(guid, None, buffer, size.value, 0)
+        if result == _CR_SUCCESS:
+            return frozenset(name for name in buffer[:size.value].split('\0') if name)
+        if result != _CR_BUFFER_SMALL:
+            return None
+    return None
+
+def _extract(buff, kind, byte, bit):
+    # value of one input extractor of the decode plan
+    if kind == _IN_BIT:
+        return (buff[byte] >> bit) & 1
+    elif kind == _IN_BYTE:
+        return buff[byte]
+    elif kind == _IN_SIGNED:
+        return buff[byte] - 256 if buff[byte] & 0x80 else buff[byte]
+    else:
+        return (buff[byte] << 8) | buff[byte + 1]
+
+# Returned by _blink_masks() while no blink pattern is in its off phase
+_NO_BLINK = (0, 0)
+
+def _no_actions():
+    # actions of a device before set_actions()
+    pass
+
+# Slotted classes of user state by their attribute names, see USBSimDevice.__init__()
+_state_classes = {}
+
+def _make_state(values):
+    names = tuple(values)
+    cls = _state_classes.get(names)
+    if cls is None:
+        cls = _state_classes[names] = type("State", (), {"__slots__": names, "__repr__": lambda self: "State(" + ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in names) + ")"})
+    state = cls()
+    for name, value in values.items():
+        setattr(state, name, value)
+    return state
 
 def setbit(b, bit_nr, nb):
     mask = 1 << bit_nr
@@ -46,18 +185,50 @@ class USBSimDevice:
     """
     # Keep Track of all instances
     Workers: List = [] # Type: : 
-    # All necessery SimVars
+    # All necessery SimVars, and the devices using each of them
     Simvars: List = []
+    SimvarIndex: Dict = {}
+    SimvarRates: Dict = {}
+    # Module providing device() and enumerate() like hid, i.e. simulated devices from USBSimBackend
+    Backend = hid
     # Internal Constants
     STAT_NOK = 0
     STAT_OK  = 1
-    # Time base for common blinking frequency of all devices
-    BLINKTIME = 0.7
-    blink_start = time()
-    blink_phase = False
-    
+    # Common time base for blinking of all devices
+    blink_epoch = monotonic()
+    # Threaded mode: default for new instances, blocking read timeout (ms) and size of the report inbox. When it is
+    # full, the reader of METH.READ_ALL stops reading until update() takes reports, otherwise the oldest one is dropped
+    THREADED = False
+    READ_TIMEOUT = 100
+    INBOX_SIZE = 256
+    # Number of reports METH.READ_ALL takes per update, further ones stay queued
+    RING_SIZE = 64
+    # Set by reader threads whenever a report arrives, see wait() and notify()
+    Wakeup = threading.Event()
+    # Hotplug: minimum time (s) between bus enumerations for all devices, reconnect backoff range (s) and
+    # probe detecting changes of the device set, which is enumerated only when the probe result changes.
+    ENUM_TTL = 1.0
+    RECONNECT_MIN = 0.5
+    RECONNECT_MAX = 30.0
+    HOTPLUG_PROBE = (staticmethod(hidraw_nodes) if os.name == 'posix' else
+                     staticmethod(hid_interfaces) if os.name == 'nt' else None)
+    _enum_paths = {}
+    _enum_time = None
+    _enum_token = None
+    # Largest report read, size of the preallocated read buffers unless the default buffer is larger
+    REPORT_SIZE = 64
+    # Instance state, no __dict__: attributes of the actions belong into the state declared at __init__
+    __slots__ = ("vendor_id", "product_id", "interface", "name", "dev", "status", "state", "readbuffer", "old_readbuffer",
+                 "_read_buffers", "_read_views", "_read_back", "_report_seq", "_ring", "_ring_pos", "batch", "_batch_base", "_reseed", "method",
+                 "writebuffer", "writeUpdate", "write_interval", "poll_priority", "poll_rate", "poll_latency", "_written",
+                 "_write_spare", "_write_time", "inputs", "_input_plan", "_input_mask", "_input_idle", "_input_axes",
+                 "_axes_buffer", "_axes_seq", "_axes_values", "_decoded", "outputs", "_output_index", "_transaction",
+                 "_displays", "blinkers", "_blink_groups", "_blink_masks_last", "_blink_bytes", "threaded", "_inbox", "_inbox_room",
+                 "_reader", "_reader_stop", "_reader_error", "on_report", "readable", "metrics", "profiling", "report_ns",
+                 "_simvars_ns", "_write_origin", "simvars", "_simvars_pending", "_retry_at", "_retry_delay",
+                 "actions", "__weakref__")
 
-    def __init__(self,vendor_id, product_id, interface = 0, method = METH.READ, default=b'\0'*64):
+    def __init__(self,vendor_id, product_id, interface = 0, method = METH.READ, default=b'\0'*64, threaded = None, state = None):
         """
         Initializes the class instance with parameters specific to a certain HID device. Also a reference to
         the instance is placed into the Workers list of the class.
@@ -67,25 +238,95 @@ class USBSimDevice:
             product_id (int): USB product ID of the HID Device
             interface (int): USB interface to be used, defaults to 0
             method (int): sets up one or more access methods for the USB device, bitwise and for different mehtods is possible.
+                METH.READ_ALL reads all pending reports into a ring buffer, see input_batch().
             default (bytes): default structure of the read/write buffer, could hold static or initial settings.
+            threaded (bool): use a background reader thread with blocking reads instead of polling the device in update(),
+                defaults to the class variable THREADED. The optional callable attribute on_report is called from the reader
+                thread for every report received.
+            state (dict): attributes and initial values of the user state self.state used by the actions, i.e.
+                dict(select=0) for self.state.select
            
         Setting inputs and outputs is a shortcut to set_inputs and set_outputs methods.
+        The device handle is created by the class variable Backend, which is the hid module unless replaced, i.e. by the
+        simulated devices of USBSimBackend.
 
         """
         self.vendor_id = vendor_id
         self.product_id = product_id
         self.interface = interface
-        self.dev = hid.device()
+        # optional name shown in reports, i.e. the name of a profile
+        self.name = None
+        self.dev = USBSimDevice.Backend.device()
         self.status = USBSimDevice.STAT_NOK
+        self.state = None if state is None else _make_state(state)
         self.readbuffer = default
         self.old_readbuffer = default
+        # reports are copied into the buffer not holding readbuffer, and handed out as memoryview of their length
+        size = max(USBSimDevice.REPORT_SIZE, len(default))
+        self._read_buffers = (bytearray(size), bytearray(size))
+        self._read_views = ({}, {})
+        self._read_back = 0
+        self._report_seq = 0
+        self._ring = [bytearray(len(default)) for _ in range(USBSimDevice.RING_SIZE)] if method & METH.READ_ALL else []
+        self._ring_pos = 0
+        self.batch = []
+        # report the changes of the batch are counted from, the first report of the first batch after connecting
+        self._batch_base = default
+        self._reseed = True
         self.method = method
         self.writebuffer = bytearray(default)
         self.writeUpdate = False
+        self.write_interval = 0.0
+        self.poll_priority = PRIO.NORMAL
+        self.poll_rate = None
+        self.poll_latency = None
+        self._written = None
+        # staging buffer of the next write, swapped with _written after each transfer
+        self._write_spare = bytearray()
+        self._write_time = 0.0
         self.inputs = []
+        self._input_plan = ()
+        self._input_mask = 0
+        self._input_idle = {}
+        self._input_axes = {}
+        self._axes_buffer = None
+        self._axes_seq = 0
+        self._axes_values = {}
+        # (report number, report, {IOname:value}) of the changed inputs, set by USBSimMatrix.ReportMatrix.decode()
+        self._decoded = None
         self.outputs = []
+        self._output_index = {}
+        self._transaction = 0
+        self._displays = {}
         self.blinkers = dict()
-        self.blink_start = USBSimDevice.blink_start
+        self._blink_groups = dict()
+        self._blink_masks_last = _NO_BLINK
+        # (masks, ((byte, clear, set), ...)) of the last blink_apply()
+        self._blink_bytes = (_NO_BLINK, ())
+        self.threaded = USBSimDevice.THREADED if threaded is None else threaded
+        self._inbox = deque(maxlen=USBSimDevice.INBOX_SIZE)
+        # set by update() after taking reports, a reader thread of METH.READ_ALL waits for it while the inbox is full
+        self._inbox_room = threading.Event()
+        self._reader = None
+        self._reader_stop = False
+        self._reader_error = None
+        self.on_report = None
+        # set by a poller, i.e. USBSimHidraw.Poller: False skips reading in update(), None reads at every update
+        self.readable = None
+        self.metrics = None
+        # set by USBSimProfiler.Profiler.attach()
+        self.profiling = None
+        # latency tracing, see USBSimTrace: stamps of the last report and the first pending simvar change
+        self.report_ns = 0
+        self._simvars_ns = 0
+        self._write_origin = None
+        self.simvars = set()
+        self._simvars_pending = set()
+        self._retry_at = 0.0
+        self._retry_delay = USBSimDevice.RECONNECT_MIN
+        if isinstance(getattr(type(self), 'actions'), MemberDescriptorType):
+            # not overridden by a subclass method
+            self.actions = _no_actions
         USBSimDevice.Workers.append(self)
         self.update()
 
@@ -94,12 +335,51 @@ class USBSimDevice:
         
         Args:
             inputs (list): list containing IO objects configuring the possible inputs with name, byte and bitpositions.
-                The bitposition can be 0-7 (bit inside the byte), 8 (full byte), 16 (integer) or -7 (signed byte)
+                The bitposition can be 0-7 (bit inside the byte), 8 (full byte), 16 (integer) or -7 (signed byte).
+                An USBSimAxis.Axis as fourth field processes the values of an analog input, see input_ios().
         Example:
             my_usb_device.set_inputs([IO("Button1", 3, 0)] # Button1 references the first bit on the fourth byte of a HID input
         """
         self.inputs = inputs.copy()
-        
+        self._compile_inputs()
+
+    def _compile_inputs(self):
+        """Builds the decode plan for the configured inputs. IOs are grouped by their start byte, each group holding
+        the mask of all bits it depends on and the extractors for its IOs. Bit offsets refer to the report read as a
+        little endian integer, so byte n starts at bit 8*n.
+        """
+        groups = {}
+        axes = {}
+        for io in self.inputs:
+            if io.bit == -7:
+                kind, mask = _IN_SIGNED, 0xff
+            elif io.bit < 8:
+                kind, mask = _IN_BIT, 1 << io.bit
+            elif io.bit == 8:
+                kind, mask = _IN_BYTE, 0xff
+            elif io.bit == 16:
+                kind, mask = _IN_WORD, 0xffff
+            else:
+                raise ValueError(f"Unsupported bit position {io.bit} for input {io.name}")
+            groups.setdefault(io.byte, []).append((io.name, kind, io.byte, io.bit, mask))
+            if io.axis is not None:
+                io.axis.default_range(*_IN_RANGE[kind])
+                axes[io.name] = io.axis
+        plan = []
+        full_mask = 0
+        for byte in sorted(groups):
+            group_mask = 0
+            for extractor in groups[byte]:
+                group_mask |= extractor[4]
+            plan.append((byte * 8, group_mask, tuple(groups[byte])))
+            full_mask |= group_mask << (byte * 8)
+        self._input_plan = tuple(plan)
+        self._input_mask = full_mask
+        self._input_idle = dict.fromkeys((io.name for io in self.inputs), False)
+        self._input_axes = axes
+        self._axes_buffer = None
+        self._axes_seq = 0
+
     def set_outputs(self, outputs):
         """Sets a list of f possible Outputs for the USB HID device.
         
@@ -110,35 +390,201 @@ class USBSimDevice:
             my_usb_device.set_outputs([IO("Led1", 3, 0)] # Led1 references the first bit on the fourth byte of a HID output
         """
         self.outputs = outputs.copy()
+        # name -> (byte, bit, mask) for fast access in output_io and blinking
+        self._output_index = {io.name: (io.byte, io.bit, 0xff if io.bit == 8 else 1 << io.bit) for io in self.outputs}
+        if self.blinkers:
+            self._compile_blinkers()
         
+    def set_displays(self, displays):
+        """Sets the numeric displays inside the write buffer, see USBSimDisplay.
+
+        Args:
+            displays (list): list containing USBSimDisplay.Display objects with name, start position and SegmentFormat
+        Example:
+            my_usb_device.set_displays([Display("Top", 1, SegmentFormat(5))]) # five digits from the second byte on
+        """
+        # name -> [pos, format, (last value, its format), its bytes]
+        self._displays = {display.name: [display.pos, display.format, None, None] for display in displays}
+
     def set_actions(self, actions):
         """Sets a reference to a function that is performed when the instance method action is called. This function is defining the main
-        interactions between HID inputs, Simvars, Simevents and HID outputs.
+        interactions between HID inputs, Simvars, Simevents and HID outputs. Until then actions() does nothing.
+        Values kept between calls belong into the state declared when creating the device.
         
         Args:
             actions (callable): reference to a function.
         """
         if callable(actions):
             setattr(self, 'actions', actions.__get__(self, USBSimDevice))
+            if self.metrics is not None:
+                self._time_actions()
+            if self.profiling is not None:
+                self.profiling.attach('actions')
+
+    def enable_metrics(self):
+        """Starts collecting counters and latency histograms for this device, see metrics_snapshot().
+        """
+        if self.metrics is None:
+            self.metrics = USBSimMetrics.DeviceMetrics()
+            self.metrics.connects = int(self.status == USBSimDevice.STAT_OK)
+            self._time_actions()
+
+    def _time_actions(self):
+        """Wraps the current actions to record their duration.
+        """
+        actions = self.actions
+        histogram = self.metrics.actions
+
+        def timed():
+            start = perf_counter_ns()
+            try:
+                return actions()
+            finally:
+                histogram.add(perf_counter_ns() - start)
+        self.actions = timed
+
+    def metrics_snapshot(self):
+        """Returns the metrics of this device as a dict, None if metrics are not enabled. Counters are reads, dropped
+        (reports skipped by READ_LAST or lost to a full inbox), overflows (lost to a full inbox), writes, writes_skipped (buffer unchanged), reconnects and exceptions by type,
+        histograms are read, write and actions.
+        """
+        return None if self.metrics is None else self.metrics.snapshot()
+
+    @classmethod
+    def metrics_report(cls):
+        """Returns the metrics snapshots of all Workers with metrics enabled, keyed by USBSimMetrics.label() with the
+        index in Workers.
+        """
+        return USBSimMetrics.report(cls.Workers)
             
-    def set_simvars(self,simvars):
+    def set_simvars(self,simvars, rate = RATE.NORMAL):
         """While USBSimDevice does not directly interact with SimConnect, the class variable Simvars can be set with this mehtod
-        to keep track of all Simvars used by different instances in order not to load them multiple times.
+        to keep track of all Simvars used by different instances in order not to load them multiple times. The class
+        variable SimvarIndex keeps track of the devices using each simvar, see dispatch_simvars(), and SimvarRates of the
+        most frequent rate class requested for it, see simvar_groups().
         
         Args:
             simvars (list): list of simvars used by the instance to be added to the class variable Simvars
+            rate (int): rate class for these simvars, RATE.ONCHANGE, RATE.FAST, RATE.NORMAL or RATE.SLOW
         """
-        USBSimDevice.Simvars = list(set(USBSimDevice.Simvars + simvars))
-        
-        
-    def blink_on(self, io, offvalue = 0):
+        for name in simvars:
+            users = USBSimDevice.SimvarIndex.setdefault(name, [])
+            if not users:
+                USBSimDevice.Simvars.append(name)
+            if self not in users:
+                users.append(self)
+            USBSimDevice.SimvarRates[name] = min(rate, USBSimDevice.SimvarRates.get(name, rate))
+        self.simvars.update(simvars)
+
+    @classmethod
+    def simvar_groups(cls):
+        """Returns all simvars grouped by rate class {rate:[simvars]}, to be subscribed separately.
+        """
+        groups = {}
+        for name in cls.Simvars:
+            groups.setdefault(cls.SimvarRates.get(name, RATE.NORMAL), []).append(name)
+        return groups
+
+    @classmethod
+    def dispatch_simvars(cls, changed):
+        """Hands changed simvars to the devices using them, to be picked up by their changed_simvars().
+
+        Args:
+            changed (iterable): names of the simvars changed, i.e. simdata.changedsince(latest)
+        Returns:
+            set: devices concerned by the changes
+        """
+        devices = set()
+        for name in changed:
+            for device in cls.SimvarIndex.get(name, ()):
+                device._simvars_pending.add(name)
+                devices.add(device)
+        if devices and USBSimTrace.tracer is not None:
+            stamp = monotonic_ns()
+            for device in devices:
+                if not device._simvars_ns:
+                    device._simvars_ns = stamp
+        return devices
+
+    def changed_simvars(self):
+        """Returns the set of simvars of this device changed since the last call, meant to be called by its actions.
+        """
+        pending = self._simvars_pending
+        if not pending:
+            return _NO_SIMVARS
+        self._simvars_pending = set()
+        if USBSimTrace.tracer is not None:
+            USBSimTrace.tracer.set_origin("simvar", self._simvars_ns, self)
+        self._simvars_ns = 0
+        return pending
+
+    def refresh_simvars(self):
+        """Reports all simvars of this device as changed at the next changed_simvars(), i.e. to redraw all outputs.
+        """
+        self._simvars_pending.update(self.simvars)
+
+    def triggered(self):
+        """Returns True if the last update() brought new input or simvars of this device have changed, i.e. whether
+        its actions have something to do.
+        """
+        return self.readbuffer is not self.old_readbuffer or bool(self._simvars_pending)
+
+    def set_write_interval(self, interval):
+        """Sets a minimum time between two transfers to the device. Changes made in between are coalesced and sent
+        together with the next transfer, i.e. an interval of 1/60 allows at most one write per frame.
+
+        Args:
+            interval (float): minimum time between writes in seconds, 0 writes at every update with changes
+        """
+        self.write_interval = interval
+
+    def set_poll(self, priority=PRIO.NORMAL, rate=None, latency=None):
+        """Configures how often USBSimScheduler polls the device. The scheduler adapts the interval between updates to
+        the reports received, within the limits given here.
+
+        Args:
+            priority (int): PRIO.AXIS, PRIO.HIGH, PRIO.NORMAL or PRIO.LOW, served in this order when several devices are due
+            rate (float): highest poll rate in Hz while reports arrive, defaults to USBSimScheduler.POLL_RATE
+            latency (float): longest time between two polls in seconds even when idle, i.e. the latency budget of an axis
+        """
+        self.poll_priority = priority
+        self.poll_rate = rate
+        self.poll_latency = latency
+
+    def pending_work(self):
+        """Returns the number of reports the reader thread has queued for update() and the number of changed simvars
+        not yet taken by the actions, i.e. for a scheduler deciding whether the device is due.
+        """
+        return len(self._inbox), len(self._simvars_pending)
+
+    def next_due(self, now):
+        """Returns the time update() is needed next to write pending changes or to apply the next blink phase, None
+        if the outputs need no update. Input reports are not considered, see pending_work().
+
+        Args:
+            now (float): current time of time.monotonic()
+        """
+        due = None
+        if self.writeUpdate and self.method & (METH.WRITE | METH.WRITE_FEATURE):
+            due = self._write_time + self.write_interval
+        if self._blink_groups:
+            elapsed = now - USBSimDevice.blink_epoch
+            step = min((int(elapsed / pattern.step) + 1) * pattern.step for pattern in self._blink_groups)
+            blink = USBSimDevice.blink_epoch + step
+            due = blink if due is None else min(due, blink)
+        return due
+
+    def blink_on(self, io, offvalue = 0, pattern = BLINK.SLOW):
         """Switch on blinking on specific IO
         
         Args:
             io (string): which IO to switch
             offvalue (int): value of output when swiched off
+            pattern (Blink): blink pattern, i.e. BLINK.SLOW, BLINK.FAST or BLINK.DOUBLE
         """
-        self.blinkers[io]=offvalue
+        if self.blinkers.get(io) != (offvalue, pattern):
+            self.blinkers[io] = (offvalue, pattern)
+            self._compile_blinkers()
 
     def blink_off(self, io):
         """Switch off blinking on specific IO
@@ -146,125 +592,521 @@ class USBSimDevice:
         Args:
             io (string): which IO to switch
         """
-        self.blinkers.pop(io, False)
+        if self.blinkers.pop(io, False):
+            self._compile_blinkers()
+
+    def _compile_blinkers(self):
+        """Builds a pair of masks (bits to clear, bits to set) per blink pattern. Bit offsets refer to the write buffer
+        read as a little endian integer, so byte n starts at bit 8*n.
+        """
+        groups = {}
+        for name, (offvalue, pattern) in self.blinkers.items():
+            byte, bit, mask = self._output_index[name]
+            clear, set_ = groups.get(pattern, (0, 0))
+            if bit == 8:
+                clear |= 0xff << (8 * byte)
+                set_ = (set_ & ~(0xff << (8 * byte))) | ((offvalue & 0xff) << (8 * byte))
+            else:
+                bit = 8 * byte + bit
+                clear |= 1 << bit
+                set_ = (set_ & ~(1 << bit)) | ((1 if offvalue == 1 else 0) << bit)
+            groups[pattern] = (clear, set_)
+        self._blink_groups = groups
+
+    def _blink_masks(self):
+        """Returns the combined masks (bits to clear, bits to set) of all blink patterns currently in their off phase.
+        """
+        if not self._blink_groups:
+            return _NO_BLINK
+        clear, set_ = 0, 0
+        now = monotonic() - USBSimDevice.blink_epoch
+        for pattern, (group_clear, group_set) in self._blink_groups.items():
+            if pattern.steps[int(now / pattern.step) % len(pattern.steps)]:
+                clear |= group_clear
+                set_ = (set_ & ~group_clear) | group_set
+        return (clear, set_) if clear else _NO_BLINK
 
     def blink_apply(self, original_buffer):
-        """Returns writebuffer modified by blinking
+        """Returns writebuffer modified by blinking, staged in a buffer that is reused by the next call
 
         Args:
             original_buffer (bytes): original write buffer unaffected by blinking
         """
-        if bool(self.blinkers) == False:
-            return original_buffer
-        elif USBSimDevice.blink_phase == False:
+        masks = self._blink_masks()
+        if masks is _NO_BLINK:
             return original_buffer
-        else:
-            # modify all bytes / bits affected by blinking
-            new_buffer = original_buffer.copy()
-            for i in self.blinkers:
-                io = next(item for item in self.outputs if item.name == i)
-                if io.bit == 8:
-                    new_buffer[io.byte] = self.blinkers[i]
-                else:
-                    new_buffer[io.byte] = setbit(new_buffer[io.byte], io.bit, self.blinkers[i])
-            return new_buffer
+        if self._blink_bytes[0] != masks:
+            # bytes affected by blinking, only rebuilt when a blink phase changes
+            clear, set_ = masks
+            self._blink_bytes = (masks, tuple((i, ~(clear >> 8 * i) & 0xff, (set_ >> 8 * i) & 0xff)
+                                              for i in range((clear.bit_length() + 7) // 8) if (clear >> 8 * i) & 0xff))
+        staged = self._write_spare
+        staged[:] = original_buffer
+        for i, keep, set_ in self._blink_bytes[1]:
+            if i < len(staged):
+                staged[i] = (staged[i] & keep) | set_
+        return staged
+
+    @classmethod
+    def wait(cls, timeout=None):
+        """Blocks until a reader thread has received a report or notify() has been called, but at most timeout seconds.
+        Meant to replace fixed sleeps in the main loop when devices run in threaded mode.
+
+        Args:
+            timeout (float): maximum time to wait in seconds, None waits forever
+        Returns:
+            bool: True if woken up by new data, False on timeout
+        """
+        woken = cls.Wakeup.wait(timeout)
+        cls.Wakeup.clear()
+        return woken
+
+    @classmethod
+    def notify(cls):
+        """Wakes up the main loop waiting in wait(), i.e. from other event sources than USB devices.
+        """
+        cls.Wakeup.set()
+
+    @classmethod
+    def enumerate(cls, force=False):
+        """Returns the shared enumeration cache {(vendor_id, product_id, interface):path} of all HID devices. The bus is
+        enumerated at most once per ENUM_TTL seconds for all instances, and only if HOTPLUG_PROBE reports a change of
+        the device set since the last enumeration.
+
+        Args:
+            force (bool): enumerate regardless of ENUM_TTL and HOTPLUG_PROBE
+        """
+        now = monotonic()
+        if not force and cls._enum_time is not None and now - cls._enum_time < cls.ENUM_TTL:
+            return cls._enum_paths
+        # the probe only knows about real devices
+        native = cls.Backend is hid or getattr(cls.Backend, 'NATIVE', False)
+        token = cls.HOTPLUG_PROBE() if cls.HOTPLUG_PROBE is not None and native else None
+        if force or cls._enum_time is None or token is None or token != cls._enum_token:
+            paths = {}
+            for d in cls.Backend.enumerate(0, 0):
+                paths.setdefault((d["vendor_id"], d["product_id"], d["interface_number"]), d["path"])
+            USBSimDevice._enum_paths = paths
+            USBSimDevice._enum_token = token
+        USBSimDevice._enum_time = now
+        return cls._enum_paths
+
+    @classmethod
+    def enumerate_invalidate(cls):
+        """Makes the next enumerate() call after ENUM_TTL scan the bus even if the hotplug probe reports no change.
+        """
+        USBSimDevice._enum_token = None
+
+    def _connect(self):
+        """Tries to open the device found in the enumeration cache, with exponential backoff between failed attempts.
+        """
+        now = monotonic()
+        if now < self._retry_at:
+            return
+        path = USBSimDevice.enumerate().get((self.vendor_id, self.product_id, self.interface))
+        if path is None:
+            # not plugged in, costs a lookup until the cache sees it
+            return
+        try:
+            self.dev.open_path(path)
+            self.dev.set_nonblocking(not self.threaded)
+            self.status = USBSimDevice.STAT_OK
+            self._retry_delay = USBSimDevice.RECONNECT_MIN
+            if self.metrics is not None:
+                self.metrics.connects += 1
+            # device state is unknown after (re)connecting, send the complete buffer again
+            self._written = None
+            # reports of a batch before (re)connecting are no reference for counting steps
+            self.batch.clear()
+            self._reseed = True
+            for axis in self._input_axes.values():
+                axis.reset()
+            self.writeUpdate = True
+            if self.threaded and self.method & (METH.READ | METH.READ_LAST | METH.READ_ALL):
+                self._start_reader()
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.exception(e)
+            self.status = USBSimDevice.STAT_NOK
+            self._retry_at = now + self._retry_delay
+            self._retry_delay = min(self._retry_delay * 2, USBSimDevice.RECONNECT_MAX)
+            USBSimDevice.enumerate_invalidate()
+
+    def _start_reader(self):
+        """Starts the background reader thread of a connected device in threaded mode.
+        """
+        self._inbox.clear()
+        self._reader_stop = False
+        self._reader_error = None
+        self._reader = threading.Thread(target=self._reader_loop, name=f"USBSimDevice {self.vendor_id:04x}:{self.product_id:04x}", daemon=True)
+        self._reader.start()
+
+    def _stop_reader(self):
+        """Stops the background reader thread, waiting at most for one blocking read to time out.
+        """
+        if self._reader is not None:
+            self._reader_stop = True
+            self._inbox_room.set()
+            if self._reader is not threading.current_thread():
+                self._reader.join(USBSimDevice.READ_TIMEOUT / 1000 * 2)
+            self._reader = None
+
+    def _reader_loop(self):
+        """Body of the reader thread: blocking reads into the inbox until stopped or the device fails.
+        """
+        dev, inbox, wakeup, room = self.dev, self._inbox, USBSimDevice.Wakeup, self._inbox_room
+        lossless = self.method & METH.READ_ALL
+        try:
+            while not self._reader_stop:
+                if lossless and len(inbox) >= inbox.maxlen:
+                    # keep further reports queued in the OS until update() has taken some
+                    room.clear()
+                    if len(inbox) >= inbox.maxlen:
+                        wakeup.set()
+                        room.wait(USBSimDevice.READ_TIMEOUT / 1000)
+                    continue
+                red = dev.read(USBSimDevice.REPORT_SIZE, USBSimDevice.READ_TIMEOUT)
+                if red:
+                    if len(inbox) == inbox.maxlen and self.metrics is not None:
+                        # the oldest report is pushed out unread, READ and READ_LAST prefer the newest reports
+                        self.metrics.overflows += 1
+                    # stamped with its arrival while tracing
+                    inbox.append((monotonic_ns() if USBSimTrace.tracer is not None else 0, red))
+                    wakeup.set()
+                    if self.on_report is not None:
+                        self.on_report()
+        except Exception as e:
+            # Hand the error over to update(), which reconnects
+            self._reader_error = e
+            wakeup.set()
+
+    def stop(self):
+        """Stops a running reader thread and closes the device. The next update() will reconnect.
+        """
+        self._stop_reader()
+        if self.status == USBSimDevice.STAT_OK:
+            self.dev.close()
+        self.status = USBSimDevice.STAT_NOK
 
     def update(self):
         """Main interaction method with the associated HID device. Calling this method will send prepared outputs via the
         configured method and also recieve new data from the devices input. Update should be called regularly on all instances of
         the USBSimDevice class.
+        The report read is a memoryview into a buffer of the device, which is reused for the report after the next one.
+        """
+        if self.profiling is not None:
+            self.profiling.run('update', self._update)
+        else:
+            self._update()
+
+    def _receive(self, report):
+        """Copies a report into the read buffer not in use and makes it the readbuffer. Further reports of the same
+        update overwrite it, the previous report stays untouched in the other buffer.
+        """
+        back = self._read_back
+        buffer = self._read_buffers[back]
+        n = len(report)
+        if n > len(buffer):
+            n = len(buffer)
+            report = report[:n]
+        buffer[:n] = report
+        self._use_read_buffer(back, n)
+
+    def _use_read_buffer(self, back, n):
+        """Makes the first n bytes of read buffer back the readbuffer.
         """
-        # prepare blinking, synch with class timer.
-        if time() - USBSimDevice.blink_start > USBSimDevice.BLINKTIME:
-            USBSimDevice.blink_start = time()
-            USBSimDevice.blink_phase = USBSimDevice.blink_phase ^ True
-        if self.blink_start != USBSimDevice.blink_start:
-            self.blink_start = USBSimDevice.blink_start
+        views = self._read_views[back]
+        view = views.get(n)
+        if view is None:
+            view = views[n] = memoryview(self._read_buffers[back])[:n]
+        self.readbuffer = view
+        self._report_seq += 1
+
+    def _update(self):
+        # prepare blinking, write when the phase of any blink pattern has changed
+        masks = self._blink_masks()
+        if masks != self._blink_masks_last:
+            self._blink_masks_last = masks
             self.writeUpdate = True
-        # main update
+        # main update, inputs only count as changed right after they were read
+        current = self.old_readbuffer = self._batch_base = self.readbuffer
+        # reports of this update go into the read buffer not holding the current report
+        self._read_back = 1 if type(current) is memoryview and current.obj is self._read_buffers[0] else 0
+        tracer = USBSimTrace.tracer
+        if tracer is not None:
+            # events and writes of the next actions have no origin until they read inputs or simvars
+            tracer.origin = None
         if self.status == USBSimDevice.STAT_NOK:
             # Try to connect / reconnect when offline
-            try:
-                self.dev.open_path([d for d in hid.enumerate(self.vendor_id,self.product_id) if d["interface_number"]==self.interface][0]["path"])
-                self.dev.set_nonblocking(True)
-                self.status = USBSimDevice.STAT_OK
-            except:
-                self.status = USBSimDevice.STAT_NOK
+            self._connect()
         else:
             # Do all read / write tasks
-            self.old_readbuffer = self.readbuffer
+            metrics = self.metrics
+            got = 0
+            # reports replaced by a later one before they were processed
+            skipped = 0
+            # arrival at the reader thread of the report the actions react to, the oldest one of a batch
+            arrival = 0
             try:
-                if self.method & METH.READ:
-                    # read once using read method
-                    red = self.dev.read(64)
-                    if len(red)>0:
-                        self.readbuffer = red
-                if self.method & METH.READ_LAST:
-                    # read until queue is empty, return last
-                    while True:
-                        red1=self.dev.read(64)
-                        if not red1:
-                            break
-                        red = red1
-                    if len(red)>0:
-                        self.readbuffer = red
+                start = perf_counter_ns() if metrics is not None else 0
+                read_ns = monotonic_ns() if tracer is not None else 0
+                if self._reader is not None:
+                    # threaded mode, take reports from the inbox filled by the reader thread
+                    if self._reader_error is not None:
+                        raise self._reader_error
+                    inbox = self._inbox
+                    if self.method & METH.READ_ALL:
+                        self.batch.clear()
+                        while inbox and len(self.batch) < len(self._ring):
+                            stamp, red = inbox.popleft()
+                            if not got:
+                                arrival = stamp
+                            self._batch_add(red)
+                            got += 1
+                        if inbox:
+                            USBSimDevice.Wakeup.set()
+                        if got:
+                            self._inbox_room.set()
+                            self._receive(self.batch[-1])
+                    elif inbox:
+                        if self.method & METH.READ_LAST:
+                            while inbox:
+                                arrival, red = inbox.popleft()
+                                got += 1
+                            skipped = got - 1
+                        else:
+                            arrival, red = inbox.popleft()
+                            got = 1
+                            if inbox:
+                                # more reports pending, keep the main loop awake
+                                USBSimDevice.Wakeup.set()
+                        self._receive(red)
+                elif self.readable is not False:
+                    size = USBSimDevice.REPORT_SIZE
+                    readinto = getattr(self.dev, 'readinto', None)
+                    if self.method & (METH.READ | METH.READ_LAST) and readinto is not None:
+                        # backends with readinto, i.e. USBSimHidraw, read straight into the buffer not in use
+                        back = self._read_back
+                        buffer = self._read_buffers[back]
+                        n = 0
+                        if self.method & METH.READ:
+                            n = readinto(buffer)
+                            got = 1 if n > 0 else 0
+                        if self.method & METH.READ_LAST:
+                            # read until queue is empty, keep last
+                            while True:
+                                n1 = readinto(buffer)
+                                if n1 <= 0:
+                                    break
+                                if n > 0:
+                                    skipped += 1
+                                n = n1
+                                got += 1
+                        if n > 0:
+                            self._use_read_buffer(back, n)
+                    elif self.method & (METH.READ | METH.READ_LAST):
+                        red = []
+                        if self.method & METH.READ:
+                            # read once using read method
+                            red = self.dev.read(size)
+                            if len(red)>0:
+                                got = 1
+                        if self.method & METH.READ_LAST:
+                            # read until queue is empty, return last
+                            while True:
+                                red1=self.dev.read(size)
+                                if not red1:
+                                    break
+                                if len(red)>0:
+                                    skipped += 1
+                                red = red1
+                                got += 1
+                        if len(red)>0:
+                            self._receive(red)
+                    if self.method & METH.READ_ALL:
+                        # read until queue is empty or the ring is full, keep all reports
+                        self.batch.clear()
+                        while len(self.batch) < len(self._ring):
+                            red = self.dev.read(size)
+                            if not red:
+                                break
+                            self._batch_add(red)
+                            got += 1
+                        if self.batch:
+                            self._receive(self.batch[-1])
+                if self._reseed and self.batch:
+                    # the previous report is unknown after connecting, the first one is the reference of input_batch()
+                    self._reseed = False
+                    self._batch_base = self.batch[0]
                 if self.method & METH.READ_FEATURE:
                     # read once using feature report method
-                    red = self.dev.get_feature_report(0,64)
+                    red = self.dev.get_feature_report(0, USBSimDevice.REPORT_SIZE)
                     if len(red)>0:
-                        self.readbuffer = red
-                if self.method & METH.WRITE and self.writeUpdate:
-                    # write using write method
-                    self.dev.write(self.blink_apply(self.writebuffer))
-                    self.writeUpdate = False
-                if self.method & METH.WRITE_FEATURE and self.writeUpdate:
-                    # write using feature report method
-                    self.dev.send_feature_report(self.blink_apply(self.writebuffer))
-                    self.writeUpdate = False
-            except:
+                        self._receive(red)
+                        got += 1
+                if metrics is not None:
+                    if self._reader is None:
+                        metrics.read.add(perf_counter_ns() - start)
+                    metrics.reads += got
+                    metrics.dropped += skipped
+                if got and tracer is not None:
+                    if self._reader is not None:
+                        # arrival at the reader thread
+                        read_ns = self.report_ns = arrival
+                    else:
+                        self.report_ns = monotonic_ns()
+                    tracer.span("read", "read", read_ns, self.report_ns, self, {"reports": got})
+                if self.writeUpdate and not self._transaction and self.method & (METH.WRITE | METH.WRITE_FEATURE):
+                    now = monotonic()
+                    if now - self._write_time >= self.write_interval:
+                        staged = self.blink_apply(self.writebuffer)
+                        # skip the transfer if the device already shows this buffer
+                        if staged != self._written:
+                            start = perf_counter_ns() if metrics is not None else 0
+                            if self.method & METH.WRITE:
+                                # write using write method
+                                self.dev.write(staged)
+                            else:
+                                # write using feature report method
+                                self.dev.send_feature_report(staged)
+                            # keep what the device shows, the previous buffer becomes the next staging buffer
+                            if staged is self.writebuffer:
+                                self._write_spare[:] = staged
+                                staged = self._write_spare
+                            self._write_spare = self._written if self._written is not None else bytearray()
+                            self._written = staged
+                            self._write_time = now
+                            if metrics is not None:
+                                metrics.write.add(perf_counter_ns() - start)
+                                metrics.writes += 1
+                            if tracer is not None and self._write_origin is not None:
+                                kind, stamp, _ = self._write_origin
+                                tracer.span("write", kind + ">write", stamp, monotonic_ns(), self)
+                        elif metrics is not None:
+                            metrics.writes_skipped += 1
+                        self.writeUpdate = False
+                        self._write_origin = None
+            except Exception as e:
                 # If there is an error, reset connection and reconnect at next update()
+                if metrics is not None:
+                    metrics.exception(e)
+                self._stop_reader()
                 self.dev.close()
                 self.status = USBSimDevice.STAT_NOK
+                USBSimDevice.enumerate_invalidate()
 
     def input(self):
         """Returns the raw input buffer for the instance recieved on the previous update.
         """
         # Returns raw readbuffer and diff to old readbuffer as trigger
-        return self.readbuffer, bytes(a ^ b for a, b in zip(self.readbuffer, self.old_readbuffer))
+        size = max(len(self.readbuffer), len(self.old_readbuffer))
+        trigger = self._input_changes().to_bytes(size, 'little')
+        return self.readbuffer, trigger[:min(len(self.readbuffer), len(self.old_readbuffer))]
+
+    def _input_changes(self):
+        """Returns the difference between the current and the previous read buffer as a single integer, byte n of the
+        report being bits 8*n to 8*n+7.
+        """
+        if self.readbuffer is self.old_readbuffer:
+            return 0
+        return int.from_bytes(self.readbuffer, 'little') ^ int.from_bytes(self.old_readbuffer, 'little')
     
     def input_ios(self):
         """Returns a dict {IOname:currentvalue} of all configured IOs for which a change has been detected during the previous update. IOs that
         have not changed at last update will be reported as False.
+        Inputs with an axis report the processed value instead of the raw one, and False if the axis suppressed the change.
         """
-        # returns a dict of all triggered buttons 
-        buff, trigger = self.input()
-        triggered = {}
-        for io in self.inputs:
-            if io.bit == -7:
-                if trigger[io.byte]!=0:
-                    if buff[io.byte] & (1<<7):
-                        triggered.update({io.name:(buff[io.byte]&127)-128})    
+        # returns a dict of all triggered buttons
+        triggered = self._input_idle.copy()
+        if USBSimTrace.tracer is not None and self.readbuffer is not self.old_readbuffer:
+            USBSimTrace.tracer.set_origin("report", self.report_ns, self)
+        buff = self.readbuffer
+        decoded = self._decoded
+        if decoded is not None and decoded[0] == self._report_seq and decoded[1] is buff and buff is not self.old_readbuffer:
+            # decoded with the reports of all devices
+            if not decoded[2]:
+                return triggered
+            triggered.update(decoded[2])
+        else:
+            changed = self._input_changes() & self._input_mask
+            if not changed:
+                return triggered
+            for shift, group_mask, extractors in self._input_plan:
+                group = changed >> shift
+                if not group & group_mask:
+                    continue
+                for name, kind, byte, bit, mask in extractors:
+                    if not group & mask:
+                        continue
+                    if kind == _IN_BIT:
+                        triggered[name] = (buff[byte] >> bit) & 1
+                    elif kind == _IN_BYTE:
+                        triggered[name] = buff[byte]
+                    elif kind == _IN_SIGNED:
+                        triggered[name] = buff[byte] - 256 if buff[byte] & 0x80 else buff[byte]
                     else:
-                        triggered.update({io.name:buff[io.byte]})
-                else:
-                    triggered.update({io.name:False})           
-            elif io.bit < 8:
-                if trigger[io.byte] & (1<<io.bit):
-                    triggered.update({io.name:(buff[io.byte] & (1<<io.bit))>>io.bit})
-                else:
-                    triggered.update({io.name:False})
-            elif io.bit == 8:
-                if trigger[io.byte]!=0:
-                    triggered.update({io.name:buff[io.byte]})
-                else:
-                    triggered.update({io.name:False})
-            elif io.bit == 16:
-                if trigger[io.byte]!=0 or trigger[io.byte+1]!=0:
-                    triggered.update({io.name:int.from_bytes(buff[io.byte:io.byte+2], byteorder='big', signed=False)})
-                else:
-                    triggered.update({io.name:False})
+                        triggered[name] = (buff[byte] << 8) | buff[byte + 1]
+        if self._input_axes:
+            # axes keep state, so process every report only once even if input_ios() is called again
+            if self._axes_buffer is not buff or self._axes_seq != self._report_seq:
+                self._axes_buffer = buff
+                self._axes_seq = self._report_seq
+                self._axes_values = {name: axis.process(triggered[name]) for name, axis in self._input_axes.items()
+                                     if triggered[name] is not False}
+            for name, value in self._axes_values.items():
+                triggered[name] = False if value is None else value
         return triggered
 
+    def _batch_add(self, report):
+        """Copies a report into the next slot of the ring buffer and appends it to the batch.
+        """
+        slot = self._ring[self._ring_pos]
+        slot[:] = report
+        self._ring_pos = (self._ring_pos + 1) % len(self._ring)
+        self.batch.append(slot)
+
+    def input_batch(self):
+        """Returns a dict {IOname:Batch} of all configured IOs that changed within the reports read by the previous update
+        with METH.READ_ALL (in self.batch). Batch holds the last value, the number of presses (0 to 1) and releases (1 to 0)
+        of bit inputs and the net delta, counted modulo 256 for bytes and 65536 for words so that encoder counters may wrap.
+        The first report after (re)connecting only sets the reference, it reports no changes itself.
+
+        Example:
+            steps = my_usb_device.input_batch().get("Inner")
+            if steps: print(steps.delta)
+        """
+        result = {}
+        previous = self._batch_base
+        if USBSimTrace.tracer is not None and self.batch:
+            USBSimTrace.tracer.set_origin("report", self.report_ns, self)
+        plan = self._input_plan
+        mask = self._input_mask
+        for report in self.batch:
+            changed = (int.from_bytes(report, 'little') ^ int.from_bytes(previous, 'little')) & mask
+            if changed:
+                for shift, group_mask, extractors in plan:
+                    group = changed >> shift
+                    if not group & group_mask:
+                        continue
+                    for name, kind, byte, bit, io_mask in extractors:
+                        if not group & io_mask:
+                            continue
+                        old = _extract(previous, kind, byte, bit)
+                        new = _extract(report, kind, byte, bit)
+                        if kind == _IN_BYTE:
+                            delta = ((new - old + 128) & 0xff) - 128
+                        elif kind == _IN_WORD:
+                            delta = ((new - old + 32768) & 0xffff) - 32768
+                        else:
+                            delta = new - old
+                        value, presses, releases, total = result.get(name, (0, 0, 0, 0))
+                        if kind == _IN_BIT:
+                            presses += new
+                            releases += old
+                        result[name] = Batch(new, presses, releases, total + delta)
+            previous = report
+        return result
+
     def output(self, buffer, pos=0):
         """Replaces some or all data in the write buffer and triggers writing during next update.
 
@@ -273,8 +1115,13 @@ class USBSimDevice:
             pos (int): start position of provided data inside the write buffer 
         """
         # prepare simple unformated output, inserted after pos
-        self.writebuffer[pos:len(buffer)] = buffer
-        self.writeUpdate = True
+        buffer = bytes(buffer)
+        end = pos + len(buffer)
+        if self.writebuffer[pos:end] != buffer:
+            self.writebuffer[pos:end] = buffer
+            self.writeUpdate = True
+            if USBSimTrace.tracer is not None and self._write_origin is None:
+                self._write_origin = USBSimTrace.tracer.origin
 
     def output_io(self, io, value):
         """Replaces output values in a structured way and triggers writing during next update.
@@ -283,9 +1130,79 @@ class USBSimDevice:
             io (string): key to be changed
             value (int): values to be changed on next update 
         """
-        io = next(item for item in self.outputs if item.name == io)
-        if io.bit == 8:
-            self.writebuffer[io.byte] = value
+        byte, bit, mask = self._output_index[io]
+        old = self.writebuffer[byte]
+        if bit == 8:
+            new = value
+        elif value == 1:
+            new = old | mask
         else:
-            self.writebuffer[io.byte] = setbit(self.writebuffer[io.byte], io.bit, value)
-        self.writeUpdate = True
\ No newline at end of file
+            new = old & ~mask
+        if old != new:
+            self.writebuffer[byte] = new
+            self.writeUpdate = True
+            if USBSimTrace.tracer is not None and self._write_origin is None:
+                self._write_origin = USBSimTrace.tracer.origin
+
+    def output_ios(self, values):
+        """Replaces several output values in one pass and triggers writing during next update if anything changed.
+
+        Args:
+            values (dict): {IOname:value} of all outputs to be changed
+        Example:
+            my_usb_device.output_ios({"Led1": 1, "Led2": 0})
+        """
+        buffer = self.writebuffer
+        index = self._output_index
+        changed = False
+        for io, value in values.items():
+            byte, bit, mask = index[io]
+            old = buffer[byte]
+            if bit == 8:
+                new = value
+            elif value == 1:
+                new = old | mask
+            else:
+                new = old & ~mask
+            if old != new:
+                buffer[byte] = new
+                changed = True
+        if changed:
+            self.writeUpdate = True
+            if USBSimTrace.tracer is not None and self._write_origin is None:
+                self._write_origin = USBSimTrace.tracer.origin
+
+    def display(self, name, value, format=None):
+        """Shows a value on a display set with set_displays and triggers writing during next update if its bytes changed.
+        A value shown already is not rendered again, only its bytes are compared with the write buffer, so the region is
+        written again if other outputs changed it.
+
+        Args:
+            name (string): name of the display
+            value (float): value to show, None blanks the display
+            format (SegmentFormat): rendering of this value instead of the format of the display
+        """
+        region = self._displays[name]
+        pos, default, last, data = region
+        format = format or default
+        if data is not None and last == (value, format) and self.writebuffer[pos:pos + len(data)] == data:
+            return
+        data = format.encode(value)
+        region[2], region[3] = (value, format), data
+        self.output(data, pos)
+
+    @contextmanager
+    def transaction(self):
+        """Context manager holding back writes to the device until all changes made inside are complete, i.e. when
+        update() runs in another thread than the actions.
+
+        Example:
+            with my_usb_device.transaction():
+                my_usb_device.output_io("Led1", 1)
+                my_usb_device.output([0x0f, 0x0f], 1)
+        """
+        self._transaction += 1
+        try:
+            yield self
+        finally:
+            self._transaction -= 1
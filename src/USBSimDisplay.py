@@ -0,0 +1,67 @@
+""" =============================================================================================
+USBSimDisplay
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Numeric LCD and 7-segment displays inside the write buffer of a device. A Display declares a
+region of the buffer and the SegmentFormat rendering values into it. Rendered values are kept
+in an LRU cache keyed by the rounded value, and display() only writes a region when its bytes
+change, so a stable value costs neither formatting nor a write.
+
+    lcd = SegmentFormat(5, digits=2)
+    device.set_displays([Display("Top", 1, lcd), Display("Bottom", 6, lcd)])
+    device.display("Top", simdata["AUTOPILOT ALTITUDE LOCK VAR"])
+=============================================================================================="""
+
+from collections import namedtuple
+from functools import lru_cache
+
+# Region of a display in the write buffer, rendered by format
+Display = namedtuple("Display", "name pos format")
+
+# Characters of Saitek / Logitech panel LCDs, one byte per digit
+SAITEK_CHARS = {**{str(i): i for i in range(10)}, "-": 0xde, " ": 0x0f}
+
+# Common 7-segment encoding, bits 0-6 are segments a-g
+SEVEN_SEGMENT_CHARS = {"0": 0x3f, "1": 0x06, "2": 0x5b, "3": 0x4f, "4": 0x66, "5": 0x6d, "6": 0x7d, "7": 0x07,
+                       "8": 0x7f, "9": 0x6f, "-": 0x40, " ": 0x00}
+
+
+class SegmentFormat:
+    """Renders numbers right aligned into width bytes, one byte per character. Values are rounded to 10**digits first,
+    which is also the key of the cache, so small changes below the shown resolution are cache hits.
+
+    Example:
+        SegmentFormat(5, digits=2).encode(2549.7)  # b'\\x0f\\x02\\x05\\x00\\x00', shown as " 2500"
+    """
+    def __init__(self, width=5, digits=0, chars=SAITEK_CHARS, cache=256):
+        """
+        Args:
+            width (int): number of characters of the display
+            digits (int): number of low digits rounded off, i.e. 2 shows altitudes in hundreds of feet
+            chars (dict): byte of each character, needs "0"-"9", "-" and " " for blank positions
+            cache (int): number of rendered values kept
+        """
+        self.width = width
+        self.digits = digits
+        self.chars = dict(chars)
+        self.blank = bytes((self.chars[" "],)) * width
+        self._render = lru_cache(maxsize=cache)(self._render)
+
+    def _render(self, key):
+        text = str(key * 10 ** self.digits)[-self.width:]
+        chars = self.chars
+        return bytes(chars[" "] for _ in range(self.width - len(text))) + bytes(chars[c] for c in text)
+
+    def encode(self, value):
+        """Returns the bytes showing value, a blank display for None.
+        """
+        if value is None:
+            return self.blank
+        return self._render(round(value / 10 ** self.digits))
+
+    def cache_info(self):
+        """Returns the statistics of the render cache, see functools.lru_cache.
+        """
+        return self._render.cache_info()
+
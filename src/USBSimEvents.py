@@ -0,0 +1,101 @@
+""" =============================================================================================
+USBSimEvents
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+v1.1 / 16.10.2026 Events traced from their origin, see USBSimTrace
+
+Event dispatch layer between device actions and the SimConnect client. Axis events are
+coalesced to the last value per frame and dropped when unchanged, discrete events are sent in
+the order they were issued. Everything is sent at flush(), once per frame.
+=============================================================================================="""
+
+from time import monotonic_ns
+import USBSimTrace
+
+# Events treated as axis events by default, further ones can be given to EventDispatcher
+AXIS_EVENTS = frozenset(['ELEVATOR_SET', 'AILERON_SET', 'RUDDER_SET', 'THROTTLE_SET', 'THROTTLE1_SET', 'THROTTLE2_SET',
+                         'PROP_PITCH_SET', 'MIXTURE_SET', 'SPOILERS_SET', 'FLAPS_SET', 'AXIS_ELEVATOR_SET',
+                         'AXIS_AILERONS_SET', 'AXIS_RUDDER_SET', 'AXIS_THROTTLE_SET', 'AXIS_MIXTURE_SET',
+                         'AXIS_PROPELLER_SET', 'AXIS_SPOILER_SET', 'ELEVATOR_TRIM_SET'])
+
+
+class EventDispatcher:
+    """Wraps a SimConnect client and batches send_event() calls until flush(). All other attributes are passed on to
+    the client, so the dispatcher can be used in place of it.
+
+    Example:
+        sc = EventDispatcher(SimConnect())
+        sc.send_event('AILERON_SET', 1000)   # coalesced
+        sc.send_event('AP_MASTER')           # kept in order
+        sc.flush()
+    """
+    def __init__(self, sc, axis_events=()):
+        """
+        Args:
+            sc (SimConnect): client to send the events with
+            axis_events (iterable): events to coalesce in addition to AXIS_EVENTS
+        """
+        self.sc = sc
+        self.axis_events = AXIS_EVENTS | frozenset(axis_events)
+        self.sent = {}
+        self._axes = {}
+        self._discrete = []
+        # origins of queued events while tracing, see USBSimTrace
+        self._origins = {}
+        self.counts = {"received": 0, "sent": 0, "coalesced": 0, "unchanged": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.sc, name)
+
+    def send_event(self, event, value=0):
+        """Queues an event until the next flush(). Axis events replace a value queued earlier for the same event.
+
+        Args:
+            event (str): SimConnect event name
+            value (int): event data
+        """
+        self.counts["received"] += 1
+        tracer = USBSimTrace.tracer
+        origin = tracer.origin if tracer is not None else None
+        if event in self.axis_events:
+            if event in self._axes:
+                self.counts["coalesced"] += 1
+            self._axes[event] = value
+            if origin is not None:
+                self._origins[event] = origin
+        else:
+            self._discrete.append((event, value, origin))
+
+    def flush(self):
+        """Sends all queued discrete events in order, then the last value of each axis event unless it was sent already.
+        """
+        send = self.sc.send_event
+        tracer = USBSimTrace.tracer
+        if self._discrete:
+            discrete, self._discrete = self._discrete, []
+            for event, value, origin in discrete:
+                send(event, value)
+                self.counts["sent"] += 1
+                if origin is not None and tracer is not None:
+                    kind, stamp, device = origin
+                    tracer.span(event, kind + ">event", stamp, monotonic_ns(), device, {"value": value})
+        if self._axes:
+            axes, self._axes = self._axes, {}
+            origins, self._origins = self._origins, {}
+            sent = self.sent
+            for event, value in axes.items():
+                if sent.get(event) == value:
+                    self.counts["unchanged"] += 1
+                    continue
+                send(event, value)
+                sent[event] = value
+                self.counts["sent"] += 1
+                origin = origins.get(event)
+                if origin is not None and tracer is not None:
+                    kind, stamp, device = origin
+                    tracer.span(event, kind + ">event", stamp, monotonic_ns(), device, {"value": value})
+
+    def forget(self):
+        """Forgets the axis values sent, so the next value is sent even if unchanged, i.e. after reconnecting.
+        """
+        self.sent.clear()
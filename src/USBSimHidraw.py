@@ -0,0 +1,239 @@
+""" =============================================================================================
+USBSimHidraw
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Native Linux backend for USBSimDevice, opening /dev/hidraw* nodes directly instead of going
+through hidapi. Reports are read into a preallocated buffer per device, and a Poller waits for
+all devices in a single epoll call, so only devices with pending reports are read.
+
+    import USBSimHidraw
+    USBSimDevice.Backend = USBSimHidraw
+    poller = USBSimHidraw.Poller()
+    while True:
+        poller.wait(0.01)
+        for worker in USBSimDevice.Workers:
+            worker.update()
+=============================================================================================="""
+
+import os
+import select
+import selectors
+from fcntl import ioctl
+
+# Real devices, USBSimDevice may use its hotplug probe with this backend
+NATIVE = True
+
+SYSFS = '/sys/class/hidraw'
+REPORT_SIZE = 4096
+
+# ioctl numbers of linux/hidraw.h, _IOC(_IOC_READ | _IOC_WRITE, 'H', nr, len)
+def _iocrw(nr, length):
+    return (3 << 30) | (length << 16) | (ord('H') << 8) | nr
+
+def HIDIOCSFEATURE(length):
+    return _iocrw(0x06, length)
+
+def HIDIOCGFEATURE(length):
+    return _iocrw(0x07, length)
+
+
+def _read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def enumerate(vendor_id=0, product_id=0):
+    """Lists the hidraw devices in the format of hid.enumerate, 0 matching any vendor or product.
+
+    The interface number is taken from the USB interface the HID device belongs to, -1 for other buses.
+    """
+    found = []
+    try:
+        nodes = sorted(os.listdir(SYSFS))
+    except OSError:
+        return found
+    for node in nodes:
+        device = os.path.join(SYSFS, node, 'device')
+        uevent = _read_text(os.path.join(device, 'uevent'))
+        if uevent is None:
+            continue
+        info = dict(line.split('=', 1) for line in uevent.splitlines() if '=' in line)
+        try:
+            bus, vid, pid = (int(x, 16) for x in info['HID_ID'].split(':'))
+        except (KeyError, ValueError):
+            continue
+        if (vendor_id and vid != vendor_id) or (product_id and pid != product_id):
+            continue
+        interface = _read_text(os.path.join(os.path.realpath(device), '..', 'bInterfaceNumber'))
+        found.append({"vendor_id": vid, "product_id": pid,
+                      "interface_number": int(interface, 16) if interface else -1,
+                      "path": os.fsencode(os.path.join('/dev', node)), "product_string": info.get('HID_NAME', ''),
+                      "manufacturer_string": "", "serial_number": info.get('HID_UNIQ', ''), "bus_type": bus})
+    return found
+
+
+class HidrawDevice:
+    """hid.device compatible handle of one hidraw node. The node is opened non-blocking, blocking reads wait for the file
+    descriptor instead, so the same handle can be used by a Poller and by a reader thread.
+    """
+    def __init__(self):
+        self.fd = -1
+        self.nonblocking = False
+        self._poll = None
+        self._buffer = bytearray(REPORT_SIZE)
+        self._view = memoryview(self._buffer)
+
+    def fileno(self):
+        """Returns the file descriptor of the open node, -1 when closed.
+        """
+        return self.fd
+
+    def open_path(self, path):
+        if self.fd >= 0:
+            self.close()
+        self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC)
+        self._poll = select.poll()
+        self._poll.register(self.fd, select.POLLIN)
+
+    def open(self, vendor_id, product_id, serial_number=None):
+        for d in enumerate(vendor_id, product_id):
+            if serial_number is None or d["serial_number"] == serial_number:
+                return self.open_path(d["path"])
+        raise OSError("open failed")
+
+    def close(self):
+        if self.fd >= 0:
+            try:
+                os.close(self.fd)
+            finally:
+                self.fd = -1
+                self._poll = None
+
+    def set_nonblocking(self, nonblocking):
+        self.nonblocking = bool(nonblocking)
+        return 0
+
+    def _check(self):
+        if self.fd < 0:
+            raise OSError("device not open")
+
+    def readinto(self, buffer, timeout_ms=0):
+        """Reads one report into buffer, returns its length, 0 if none was available within the timeout.
+
+        Args:
+            buffer (bytearray): writable buffer, reports longer than the buffer are truncated by the kernel
+            timeout_ms (int): maximum wait, 0 waits according to set_nonblocking()
+        """
+        self._check()
+        if timeout_ms > 0 or not self.nonblocking:
+            if not self._poll.poll(timeout_ms if timeout_ms > 0 else None):
+                return 0
+        try:
+            return os.readv(self.fd, (buffer,))
+        except BlockingIOError:
+            return 0
+
+    def read(self, max_length, timeout_ms=0):
+        n = self.readinto(self._view[:max_length], timeout_ms)
+        return bytes(self._view[:n])
+
+    def write(self, buff):
+        self._check()
+        return os.write(self.fd, bytes(buff))
+
+    def get_feature_report(self, report_id, max_length):
+        self._check()
+        buff = bytearray(max_length)
+        buff[0] = report_id
+        n = ioctl(self.fd, HIDIOCGFEATURE(max_length), buff, True)
+        return list(buff[:n])
+
+    def send_feature_report(self, buff):
+        self._check()
+        buff = bytearray(buff)
+        return ioctl(self.fd, HIDIOCSFEATURE(len(buff)), buff, True)
+
+
+def device():
+    """Returns a new, unopened handle like hid.device().
+    """
+    return HidrawDevice()
+
+
+class Poller:
+    """Waits for input reports of all devices with one epoll call.
+
+    Connected devices without a reader thread whose handle has a file descriptor are registered automatically at every
+    wait(). Afterwards the readable attribute of each registered device tells update() whether a report is pending, so
+    devices without data are not read at all. Devices of other backends keep being read at every update().
+    """
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (list): devices to wait for, defaults to USBSimDevice.Workers
+        """
+        if workers is None:
+            from USBSimDevice import USBSimDevice
+            workers = USBSimDevice.Workers
+        self.workers = workers
+        self.selector = selectors.DefaultSelector()
+        self._fds = {}
+
+    def _sync(self):
+        """Follows (re)connects and disconnects of the devices.
+        """
+        wanted = {}
+        for worker in self.workers:
+            fileno = getattr(worker.dev, 'fileno', None)
+            if fileno is None or worker.status != worker.STAT_OK or worker._reader is not None:
+                continue
+            fd = fileno()
+            if fd >= 0:
+                wanted[worker] = fd
+        if wanted == self._fds:
+            return
+        # unregister first, a closed descriptor may have been reused by another device
+        for worker, fd in self._fds.items():
+            if wanted.get(worker) != fd:
+                try:
+                    self.selector.unregister(fd)
+                except (KeyError, ValueError):
+                    pass
+                worker.readable = None
+        for worker, fd in wanted.items():
+            if self._fds.get(worker) != fd:
+                self.selector.register(fd, selectors.EVENT_READ, worker)
+        self._fds = wanted
+
+    def wait(self, timeout=None):
+        """Blocks until at least one device has a report pending, but at most timeout seconds.
+
+        Args:
+            timeout (float): maximum time to wait in seconds, None waits forever
+        Returns:
+            list: devices with reports pending
+        """
+        self._sync()
+        if not self._fds:
+            # nothing to wait for, behave like a sleep
+            select.select((), (), (), timeout)
+            return []
+        for worker in self._fds:
+            worker.readable = False
+        ready = []
+        for key, _ in self.selector.select(timeout):
+            key.data.readable = True
+            ready.append(key.data)
+        return ready
+
+    def close(self):
+        """Unregisters all devices, which are then read at every update() again.
+        """
+        for worker in self._fds:
+            worker.readable = None
+        self._fds = {}
+        self.selector.close()
@@ -0,0 +1,137 @@
+""" =============================================================================================
+USBSimMatrix
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Optional decoding of the inputs of all devices at once with NumPy. The current and previous
+reports of all Workers with inputs are kept in two preallocated 2-D uint8 arrays, one row per
+device. One XOR over the arrays gives the changes of all devices, and the configured bit, byte,
+signed and 16 bit inputs are extracted through precomputed index arrays, so the decoding cost
+grows with the number of changed inputs instead of the number of inputs configured.
+input_ios() of each device then uses the decoded values instead of decoding its report again.
+
+    matrix = ReportMatrix()
+    while True:
+        ...
+        matrix.step()
+=============================================================================================="""
+
+from USBSimDevice import USBSimDevice, _IN_BIT, _IN_BYTE, _IN_SIGNED, _IN_WORD
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# True if NumPy is installed
+AVAILABLE = np is not None
+
+
+class ReportMatrix:
+    """Report arrays and extraction indexes of all devices with inputs.
+    """
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (list): devices to decode, defaults to USBSimDevice.Workers
+        """
+        if np is None:
+            raise ImportError("ReportMatrix needs NumPy")
+        self.workers = USBSimDevice.Workers if workers is None else workers
+        self._plans = None
+        self._dirty = []
+
+    def _compile(self):
+        """Allocates the report arrays and builds the index arrays for the inputs configured now.
+        """
+        self._plans = tuple(device._input_plan for device in self.workers)
+        self.devices = [device for device in self.workers if device._input_plan]
+        width = 1
+        for device in self.devices:
+            width = max(width, len(device.readbuffer), len(device.old_readbuffer),
+                        *(byte + 2 for _, _, extractors in device._input_plan for _, _, byte, _, _ in extractors))
+        self.width = width
+        self.current = np.zeros((len(self.devices), width), np.uint8)
+        self.previous = np.zeros((len(self.devices), width), np.uint8)
+        self._dirty = []
+        # per kind: rows, bytes and bit shifts of the inputs, owner and name of each extracted value in the same order
+        columns = {kind: ([], [], []) for kind in (_IN_BIT, _IN_BYTE, _IN_SIGNED, _IN_WORD)}
+        owners = {kind: [] for kind in columns}
+        for row, device in enumerate(self.devices):
+            for _, _, extractors in device._input_plan:
+                for name, kind, byte, bit, _ in extractors:
+                    rows, bytes_, shifts = columns[kind]
+                    rows.append(row)
+                    bytes_.append(byte)
+                    shifts.append(bit if kind == _IN_BIT else 0)
+                    owners[kind].append((device, name))
+        self._index = {kind: tuple(np.array(column, np.intp) for column in columns[kind]) for kind in columns}
+        self._owners = [owner for kind in columns for owner in owners[kind]]
+
+    def _load(self, array, row, data):
+        n = min(len(data), self.width)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            array[row, :n] = np.frombuffer(data, np.uint8, n)
+        else:
+            array[row, :n] = data[:n]
+        # bytes missing in a short report read as 0, like in USBSimDevice.input_ios()
+        array[row, n:] = 0
+
+    def decode(self):
+        """Decodes the reports read by the last update of all devices. Devices with a new report get the values of their
+        changed inputs, which their input_ios() reports.
+
+        Returns:
+            int: number of changed inputs
+        """
+        if self._plans != tuple(device._input_plan for device in self.workers):
+            self._compile()
+        current, previous = self.current, self.previous
+        # rows changed by the last decode have no changes now unless a new report arrives
+        if self._dirty:
+            previous[self._dirty] = current[self._dirty]
+        dirty = []
+        for row, device in enumerate(self.devices):
+            if device.readbuffer is not device.old_readbuffer:
+                if max(len(device.readbuffer), len(device.old_readbuffer)) > self.width:
+                    self._compile()
+                    return self.decode()
+                self._load(current, row, device.readbuffer)
+                self._load(previous, row, device.old_readbuffer)
+                device._decoded = (device._report_seq, device.readbuffer, {})
+                dirty.append(row)
+        self._dirty = dirty
+        if not dirty:
+            return 0
+        diff = current ^ previous
+        changes, values = [], []
+        rows, bytes_, shifts = self._index[_IN_BIT]
+        changes.append((diff[rows, bytes_] >> shifts) & 1 != 0)
+        values.append((current[rows, bytes_] >> shifts) & 1)
+        rows, bytes_, _ = self._index[_IN_BYTE]
+        changes.append(diff[rows, bytes_] != 0)
+        values.append(current[rows, bytes_])
+        rows, bytes_, _ = self._index[_IN_SIGNED]
+        changes.append(diff[rows, bytes_] != 0)
+        values.append(current.view(np.int8)[rows, bytes_])
+        rows, bytes_, _ = self._index[_IN_WORD]
+        changes.append((diff[rows, bytes_] | diff[rows, bytes_ + 1]) != 0)
+        values.append((current[rows, bytes_].astype(np.int32) << 8) | current[rows, bytes_ + 1])
+        changed = np.flatnonzero(np.concatenate(changes))
+        if not len(changed):
+            return 0
+        owners = self._owners
+        for i, value in zip(changed.tolist(), np.concatenate(values)[changed].tolist()):
+            device, name = owners[i]
+            device._decoded[2][name] = value
+        return len(changed)
+
+    def step(self):
+        """Updates all devices, decodes their inputs at once and runs the actions of the triggered ones.
+        """
+        for worker in self.workers:
+            worker.update()
+        self.decode()
+        for worker in self.workers:
+            if worker.triggered():
+                worker.actions()
@@ -0,0 +1,123 @@
+""" =============================================================================================
+USBSimMetrics
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Runtime metrics of USBSimDevice instances: counters and latency histograms, collected only for
+devices on which enable_metrics() has been called.
+=============================================================================================="""
+
+import json
+import sys
+import threading
+from collections import Counter
+
+# Guards the exception counters, which the dump thread copies while the devices add to them
+_exceptions_lock = threading.Lock()
+
+
+def label(device, index):
+    """Returns vendor id:product id:interface#index of a device, followed by its name if it has one. The index keeps
+    identical devices apart.
+    """
+    text = f"{device.vendor_id:04x}:{device.product_id:04x}:{device.interface}#{index}"
+    return f"{text} {device.name}" if device.name else text
+
+
+class Histogram:
+    """Latency histogram with power of two buckets in µs, bucket n counting values below 2**n µs.
+    """
+    BUCKETS = 32
+
+    def __init__(self):
+        self.counts = [0] * Histogram.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        """Adds a duration in nanoseconds.
+        """
+        self.counts[min((ns // 1000).bit_length(), Histogram.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        """Returns the upper bound in µs of the bucket holding the p-th percentile, None if empty.
+        """
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return 2 ** bucket
+        return 2 ** (Histogram.BUCKETS - 1)
+
+    def snapshot(self):
+        return {"count": self.count, "mean_us": self.total / self.count / 1000 if self.count else None,
+                "max_us": self.max / 1000, "p50_us": self.percentile(50), "p99_us": self.percentile(99)}
+
+
+class DeviceMetrics:
+    """Counters and histograms of one device.
+    """
+    def __init__(self):
+        self.reads = 0
+        self.dropped = 0
+        # reports lost because the inbox of a threaded device was full, only counted by its reader thread
+        self.overflows = 0
+        self.writes = 0
+        self.writes_skipped = 0
+        self.connects = 0
+        self.exceptions = Counter()
+        self.read = Histogram()
+        self.write = Histogram()
+        self.actions = Histogram()
+
+    def exception(self, e):
+        """Counts an exception by its type.
+        """
+        with _exceptions_lock:
+            self.exceptions[type(e).__name__] += 1
+
+    def snapshot(self):
+        """Returns all values as a dict, suitable for json.
+        """
+        with _exceptions_lock:
+            exceptions = dict(self.exceptions)
+        return {"reads": self.reads, "dropped": self.dropped + self.overflows, "overflows": self.overflows,
+                "writes": self.writes,
+                "writes_skipped": self.writes_skipped, "reconnects": max(0, self.connects - 1),
+                "exceptions": exceptions, "read": self.read.snapshot(), "write": self.write.snapshot(),
+                "actions": self.actions.snapshot()}
+
+
+def report(workers):
+    """Returns the snapshots of all workers with metrics enabled, keyed by label() with the index in workers.
+    """
+    return {label(w, i): w.metrics.snapshot() for i, w in enumerate(workers) if w.metrics is not None}
+
+
+def start_dump(workers, interval, out=sys.stderr):
+    """Starts a daemon thread writing report(workers) as one json line every interval seconds.
+
+    Args:
+        workers (list): devices to report, i.e. USBSimDevice.Workers
+        interval (float): time between dumps in seconds
+        out (file): text file to write to
+    Returns:
+        threading.Event: set it to stop dumping
+    """
+    stop = threading.Event()
+
+    def dump():
+        while not stop.wait(interval):
+            out.write(json.dumps(report(workers)) + "\n")
+            out.flush()
+
+    threading.Thread(target=dump, name="USBSimMetrics", daemon=True).start()
+    return stop
@@ -0,0 +1,365 @@
+""" =============================================================================================
+USBSimProfile
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Declarative device profiles in JSON or TOML files, as an alternative to hardware definitions in
+code. A profile describes the device, its inputs, outputs, simvars and initial output buffer,
+while the actions are referenced by import path and only imported once the device is connected.
+Profiles are validated when a file is loaded, the compiled form is cached next to the file.
+
+Example profile (JSON):
+    {"name": "CHflight", "vendor_id": "0x079d", "product_id": "0x0201", "method": ["READ"],
+     "inputs": [{"name": "Aileron", "byte": 0, "bit": 8, "axis": {"low": 5, "high": 155}},
+                ["Buttons", 4, 8]],
+     "actions": "CHflightActions:action"}
+
+Keys:
+    name, vendor_id, product_id (required), interface, method (names of METH), default (length or
+    list of bytes), inputs, outputs (IO as list [name, byte, bit] or object with an optional axis
+    holding the arguments of USBSimAxis.Axis), simvars (list, or object of RATE name: list),
+    output (list of [pos, [bytes]] written initially), actions ("module:function"), poll (object with
+    priority as name of PRIO, rate and latency, see USBSimDevice.set_poll), state (object of
+    attributes and initial values of self.state in the actions).
+=============================================================================================="""
+
+import copy
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import sys
+from collections import namedtuple
+from USBSimDevice import USBSimDevice, METH, RATE, PRIO, IO
+from USBSimAxis import Axis
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# Compiled profile, IOs as (name, byte, bit, axis arguments or None), simvars as ((rate, names), ...),
+# poll as (priority, rate, latency), state as ((name, initial value), ...)
+Profile = namedtuple("Profile", "name vendor_id product_id interface method default inputs outputs simvars output actions poll "
+                                "state source")
+
+# Changes whenever the compiled form changes, invalidating cached files
+CACHE_VERSION = 4
+KEYS = frozenset(["name", "vendor_id", "product_id", "interface", "method", "default", "inputs", "outputs", "simvars",
+                  "output", "actions", "poll", "state"])
+AXIS_KEYS = frozenset(name for name, parameter in inspect.signature(Axis).parameters.items()
+                      if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY))
+INPUT_BITS = frozenset([0, 1, 2, 3, 4, 5, 6, 7, 8, 16, -7])
+OUTPUT_BITS = frozenset([0, 1, 2, 3, 4, 5, 6, 7, 8])
+
+_loaded = {}
+
+
+class _CacheUnpickler(pickle.Unpickler):
+    """Unpickler of cache files, which only creates compiled profiles. Anything else in a stale or foreign file raises
+    UnpicklingError instead of running code.
+    """
+    def find_class(self, module, name):
+        if module == __name__ and name == "Profile":
+            return Profile
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a profile cache")
+
+
+class SimConnectProxy:
+    """Stands for the SimConnect client in action modules, which are imported before or independent of connecting.
+    Set the client with connect(), all attributes are taken from it. The simdata attribute holds the values of the
+    subscribed simvars.
+
+    Example:
+        from USBSimProfile import sim
+        def action(self):
+            if "AUTOPILOT MASTER" in self.changed_simvars() and not sim.simdata["AUTOPILOT MASTER"]:
+                sim.send_event('AP_MASTER')
+    """
+    def __init__(self):
+        self.sc = None
+        self.simdata = {}
+
+    def __getattr__(self, name):
+        if self.sc is None:
+            raise AttributeError(f"SimConnect not connected, no attribute {name}")
+        return getattr(self.sc, name)
+
+
+sim = SimConnectProxy()
+
+
+def connect(sc, simdata=None):
+    """Makes sc the client used by actions through sim.
+
+    Args:
+        sc (SimConnect): client, or any object with send_event()
+        simdata: simvar values, i.e. the simdata of the subscription
+    """
+    sim.sc = sc
+    if simdata is not None:
+        sim.simdata = simdata
+
+
+def _error(source, name, message):
+    return ValueError(f"{source}: profile {name}: {message}")
+
+
+def _int(value, source, name, key):
+    if isinstance(value, str):
+        try:
+            return int(value, 0)
+        except ValueError:
+            pass
+    elif isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise _error(source, name, f"{key} must be an integer, not {value!r}")
+
+
+def _compile_io(entry, bits, source, name, key):
+    if isinstance(entry, dict):
+        unknown = set(entry) - {"name", "byte", "bit", "axis"}
+        if unknown:
+            raise _error(source, name, f"unknown keys {sorted(unknown)} in {key}")
+        io = (entry.get("name"), entry.get("byte"), entry.get("bit"), entry.get("axis"))
+    elif isinstance(entry, list) and len(entry) in (3, 4):
+        io = tuple(entry) + (None,) * (4 - len(entry))
+    else:
+        raise _error(source, name, f"{key} entry must be [name, byte, bit] or an object, not {entry!r}")
+    io_name, byte, bit, axis = io
+    if not isinstance(io_name, str):
+        raise _error(source, name, f"{key} entry without name: {entry!r}")
+    byte = _int(byte, source, name, f"byte of {io_name}")
+    bit = _int(bit, source, name, f"bit of {io_name}")
+    if bit not in bits or byte < 0:
+        raise _error(source, name, f"unsupported position byte {byte} bit {bit} of {io_name}")
+    if axis is not None:
+        if key != "inputs" or not isinstance(axis, dict) or set(axis) - AXIS_KEYS:
+            raise _error(source, name, f"invalid axis of {io_name}, allowed are inputs with keys {sorted(AXIS_KEYS)}")
+        axis = tuple(sorted(axis.items()))
+    return io_name, byte, bit, axis
+
+
+def compile_profile(data, source="<profile>"):
+    """Validates one profile as read from a file and returns its compiled form.
+
+    Raises:
+        ValueError: if the profile is invalid
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: a profile must be an object, not {type(data).__name__}")
+    name = data.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{source}: profile without name")
+    unknown = set(data) - KEYS
+    if unknown:
+        raise _error(source, name, f"unknown keys {sorted(unknown)}")
+    for key in ("vendor_id", "product_id"):
+        if key not in data:
+            raise _error(source, name, f"{key} missing")
+    method = 0
+    for flag in data.get("method", ["READ"]):
+        if not isinstance(flag, str) or not flag.isupper() or not isinstance(getattr(METH, flag, None), int):
+            raise _error(source, name, f"unknown method {flag!r}")
+        method |= getattr(METH, flag)
+    default = data.get("default", 64)
+    if isinstance(default, list):
+        try:
+            default = bytes(default)
+        except (TypeError, ValueError):
+            raise _error(source, name, "default must be a length or a list of bytes")
+    else:
+        default = bytes(_int(default, source, name, "default"))
+    inputs = tuple(_compile_io(e, INPUT_BITS, source, name, "inputs") for e in data.get("inputs", []))
+    outputs = tuple(_compile_io(e, OUTPUT_BITS, source, name, "outputs") for e in data.get("outputs", []))
+    for key, ios, width in (("inputs", inputs, len(default)), ("outputs", outputs, len(default))):
+        for io_name, byte, bit, axis in ios:
+            if byte + (2 if bit == 16 else 1) > width:
+                raise _error(source, name, f"{key} {io_name} beyond the buffer of {width} bytes")
+    simvars = data.get("simvars", [])
+    if isinstance(simvars, list):
+        simvars = {"NORMAL": simvars}
+    if not isinstance(simvars, dict):
+        raise _error(source, name, "simvars must be a list or an object of rate classes")
+    rates = []
+    for rate, names in simvars.items():
+        if not isinstance(getattr(RATE, str(rate), None), int):
+            raise _error(source, name, f"unknown simvar rate {rate!r}")
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+            raise _error(source, name, f"simvars of rate {rate} must be a list of names")
+        rates.append((getattr(RATE, rate), tuple(names)))
+    output = []
+    for entry in data.get("output", []):
+        if not (isinstance(entry, list) and len(entry) == 2 and isinstance(entry[1], list)):
+            raise _error(source, name, f"output entries must be [pos, [bytes]], not {entry!r}")
+        pos = _int(entry[0], source, name, "output pos")
+        try:
+            buff = bytes(entry[1])
+        except (TypeError, ValueError):
+            raise _error(source, name, f"invalid output bytes at {pos}")
+        if pos < 0 or pos + len(buff) > len(default):
+            raise _error(source, name, f"output at {pos} beyond the buffer of {len(default)} bytes")
+        output.append((pos, buff))
+    actions = data.get("actions")
+    if actions is not None and (not isinstance(actions, str) or actions.count(":") != 1):
+        raise _error(source, name, f"actions must be 'module:function', not {actions!r}")
+    poll = data.get("poll", {})
+    if not isinstance(poll, dict) or set(poll) - {"priority", "rate", "latency"}:
+        raise _error(source, name, "poll must be an object with priority, rate and latency")
+    priority = poll.get("priority", "NORMAL")
+    if not isinstance(priority, str) or not isinstance(getattr(PRIO, priority, None), int):
+        raise _error(source, name, f"unknown poll priority {priority!r}")
+    for key in ("rate", "latency"):
+        if poll.get(key) is not None and (isinstance(poll[key], bool) or not isinstance(poll[key], (int, float))
+                                          or poll[key] <= 0):
+            raise _error(source, name, f"poll {key} must be a positive number")
+    poll = (getattr(PRIO, priority), poll.get("rate"), poll.get("latency"))
+    state = data.get("state", {})
+    if not isinstance(state, dict) or not all(key.isidentifier() for key in state):
+        raise _error(source, name, "state must be an object of attribute names and initial values")
+    return Profile(name, _int(data["vendor_id"], source, name, "vendor_id"),
+                   _int(data["product_id"], source, name, "product_id"),
+                   _int(data.get("interface", 0), source, name, "interface"), method, default, inputs, outputs,
+                   tuple(rates), tuple(output), actions, poll, tuple(state.items()), os.path.abspath(source) if source[0] != "<" else None)
+
+
+def _parse(path):
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML profiles need Python 3.11 or later")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+        # a TOML file holds a single table or an array of tables named device
+        data = data.get("device", data)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def _cache_path(path):
+    head, tail = os.path.split(os.path.abspath(path))
+    return os.path.join(head, "__pycache__", tail + ".profile")
+
+
+def load(path):
+    """Loads all profiles of a JSON or TOML file. The compiled profiles are kept for the process and in a cache file,
+    which is used as long as the profile file is unchanged.
+
+    Args:
+        path (str): profile file, holding one profile or a list of profiles
+    Returns:
+        tuple: compiled profiles
+    Raises:
+        ValueError: if a profile is invalid
+    """
+    stat = os.stat(path)
+    key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    cache = _cache_path(path)
+    profiles = None
+    try:
+        with open(cache, "rb") as f:
+            stored_key, stored = _CacheUnpickler(f).load()
+        if stored_key == key and isinstance(stored, tuple) and all(type(p) is Profile for p in stored):
+            profiles = stored
+    except Exception:
+        # a broken, stale or foreign cache file, compile the profile file again
+        pass
+    if profiles is None:
+        profiles = tuple(compile_profile(data, path) for data in _parse(path))
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            with open(cache, "wb") as f:
+                pickle.dump((key, profiles), f)
+        except OSError:
+            # read only installation, compile again next time
+            pass
+    _loaded[path] = (key, profiles)
+    return profiles
+
+
+def _import_from(folder, module):
+    """Imports a module or package lying in folder without adding folder to sys.path, None if it is not there.
+    """
+    path = os.path.join(folder, module + ".py")
+    if not os.path.isfile(path):
+        path = os.path.join(folder, module, "__init__.py")
+        if not os.path.isfile(path):
+            return None
+    spec = importlib.util.spec_from_file_location(module, path)
+    loaded = importlib.util.module_from_spec(spec)
+    sys.modules[module] = loaded
+    try:
+        spec.loader.exec_module(loaded)
+    except BaseException:
+        del sys.modules[module]
+        raise
+    return loaded
+
+
+def resolve(reference, source=None):
+    """Imports the function referenced by 'module:function'. Modules are first searched for in the directory of the
+    profile file, then on sys.path.
+    """
+    module, function = reference.split(":")
+    loaded = sys.modules.get(module)
+    if loaded is None and source is not None and "." not in module:
+        loaded = _import_from(os.path.dirname(source), module)
+    if loaded is None:
+        loaded = importlib.import_module(module)
+    return getattr(loaded, function)
+
+
+def lazy_actions(reference, source=None):
+    """Returns an action function importing the referenced actions at its first call on a connected device. Until
+    then calls are ignored, simvar changes stay pending for the device.
+    """
+    function = None
+
+    def actions(self):
+        nonlocal function
+        if function is None:
+            if self.status != USBSimDevice.STAT_OK:
+                return
+            function = resolve(reference, source)
+        function(self)
+    return actions
+
+
+def create(profile):
+    """Creates the USBSimDevice described by a compiled profile.
+    """
+    device = USBSimDevice(profile.vendor_id, profile.product_id, profile.interface, profile.method, profile.default,
+                          state=copy.deepcopy(dict(profile.state)) if profile.state else None)
+    device.name = profile.name
+    if profile.inputs:
+        device.set_inputs([IO(name, byte, bit, Axis(**dict(axis)) if axis else None)
+                           for name, byte, bit, axis in profile.inputs])
+    if profile.outputs:
+        device.set_outputs([IO(name, byte, bit) for name, byte, bit, axis in profile.outputs])
+    for rate, names in profile.simvars:
+        device.set_simvars(list(names), rate)
+    for pos, buff in profile.output:
+        device.output(buff, pos)
+    device.set_poll(*profile.poll)
+    if profile.actions is not None:
+        device.set_actions(lazy_actions(profile.actions, profile.source))
+    return device
+
+
+def create_all(paths, names=None):
+    """Loads the profile files and creates their devices.
+
+    Args:
+        paths (list): profile files
+        names (iterable): names of the profiles to use, None for all
+    Returns:
+        list: the created devices
+    """
+    names = None if names is None else set(names)
+    return [create(profile) for path in paths for profile in load(path) if names is None or profile.name in names]
@@ -0,0 +1,152 @@
+""" =============================================================================================
+USBSimProfiler
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+v1.1 / 16.10.2026 Calls sampled by cProfile are not timed
+
+Optional profiling of the actions() and update() calls of devices. Every call is timed, calls
+taking longer than the budget are flagged with the device they belong to, and optionally every
+n-th call runs under cProfile, aggregated per device into a report of the functions that cost
+the most time. Calls run under cProfile are slowed down by it, they are only counted and
+neither timed nor checked against the budget.
+
+    profiler = USBSimProfiler.enable(USBSimDevice.Workers, budget=0.002, sample=10)
+    ...
+    print(profiler.report())
+=============================================================================================="""
+
+import cProfile
+import io
+import pstats
+import sys
+from collections import Counter
+from time import monotonic, perf_counter_ns
+from USBSimMetrics import Histogram, label
+
+# Active profiler, None while profiling is off
+profiler = None
+
+# Calls timed per device
+KINDS = ("actions", "update")
+
+
+class DeviceProfile:
+    """Timing of the calls of one device and its cProfile samples.
+    """
+    def __init__(self, profiler, device, index):
+        self.profiler = profiler
+        self.device = device
+        self.label = label(device, index)
+        self.timing = {kind: Histogram() for kind in KINDS}
+        self.slow = Counter()
+        self.sampled = Counter()
+        # calls per kind, so sampling picks every sample-th call of each kind
+        self.calls = Counter()
+        self.stats = cProfile.Profile() if profiler.sample else None
+        self._warned = {}
+
+    def attach(self, kind):
+        """Wraps the current actions of the device. update() calls run() itself while the device is profiled.
+        """
+        function = getattr(self.device, kind)
+        setattr(self.device, kind, lambda: self.run(kind, function))
+
+    def run(self, kind, function):
+        """Calls function, timing it as a call of the given kind, or profiling it with cProfile if sampled.
+        """
+        self.calls[kind] += 1
+        sample = self.profiler.sample
+        if sample and self.calls[kind] % sample == 0:
+            self.sampled[kind] += 1
+            return self.stats.runcall(function)
+        start = perf_counter_ns()
+        try:
+            return function()
+        finally:
+            ns = perf_counter_ns() - start
+            self.timing[kind].add(ns)
+            if ns > self.profiler.budget_ns:
+                self._flag(kind, ns)
+
+    def _flag(self, kind, ns):
+        """Counts a call over budget and reports it, at most once per WARN_INTERVAL for each kind of call.
+        """
+        self.slow[kind] += 1
+        now = monotonic()
+        if now - self._warned.get(kind, -Profiler.WARN_INTERVAL) >= Profiler.WARN_INTERVAL:
+            self._warned[kind] = now
+            self.profiler.out.write(f"USBSimProfiler: {kind} of {self.label} took {ns / 1e6:.2f} ms, "
+                                    f"budget {self.profiler.budget_ns / 1e6:.2f} ms, {self.slow[kind]} slow calls\n")
+
+    def snapshot(self):
+        return {kind: dict(self.timing[kind].snapshot(), slow=self.slow[kind], sampled=self.sampled[kind])
+                for kind in KINDS}
+
+
+class Profiler:
+    """Times the actions() and update() calls of the attached devices.
+    """
+    # Minimum time between two reports of slow calls of the same device and kind (s)
+    WARN_INTERVAL = 1.0
+
+    def __init__(self, budget=0.002, sample=0, out=sys.stderr):
+        """
+        Args:
+            budget (float): time in seconds a single call may take before it is flagged
+            sample (int): run every sample-th actions() and update() call of a device under cProfile, 0 switches it off
+            out (file): text file slow calls are reported to
+        """
+        self.budget_ns = int(budget * 1e9)
+        self.sample = sample
+        self.out = out
+        self.devices = []
+
+    def attach(self, device):
+        """Starts profiling a device. Actions set later with set_actions() are profiled as well.
+        """
+        if device.profiling is None:
+            device.profiling = DeviceProfile(self, device, len(self.devices))
+            self.devices.append(device.profiling)
+            device.profiling.attach("actions")
+
+    def summary(self):
+        """Returns the call durations and numbers of slow and sampled calls per device, keyed by label() with
+        the index of the device in the order of attach().
+        """
+        return {profile.label: profile.snapshot() for profile in self.devices}
+
+    def report(self, sort="cumulative", limit=15):
+        """Returns a text report per device: durations of its calls and, if sampling is on, the cProfile statistics
+        of the sampled calls.
+
+        Args:
+            sort (str): sort key of pstats, i.e. "cumulative" or "tottime"
+            limit (int): number of functions listed per device
+        """
+        text = io.StringIO()
+        for profile in self.devices:
+            text.write(f"=== {profile.label}\n")
+            for kind, values in profile.snapshot().items():
+                if values["count"]:
+                    text.write(f"{kind}: {values['count']} calls, mean {values['mean_us']:.1f} us, "
+                               f"max {values['max_us']:.1f} us, p99 < {values['p99_us']} us, {values['slow']} slow, "
+                               f"{values['sampled']} sampled\n")
+                elif values["sampled"]:
+                    # sampled calls are not timed
+                    text.write(f"{kind}: {values['sampled']} sampled\n")
+            if profile.stats is not None and profile.stats.getstats():
+                pstats.Stats(profile.stats, stream=text).sort_stats(sort).print_stats(limit)
+        return text.getvalue()
+
+
+def enable(workers, budget=0.002, sample=0, out=sys.stderr):
+    """Starts profiling the given devices with a new Profiler and returns it.
+
+    Args:
+        workers (list): devices to profile, i.e. USBSimDevice.Workers
+    """
+    global profiler
+    profiler = Profiler(budget, sample, out)
+    for device in workers:
+        profiler.attach(device)
+    return profiler
@@ -0,0 +1,158 @@
+""" =============================================================================================
+USBSimScheduler
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Adaptive polling of USBSimDevice workers as an alternative to updating every device a fixed
+number of times per frame. Each device gets its own poll interval: short while reports arrive,
+matched to the observed report rate, and growing while the device is idle, but never beyond its
+latency budget. Write only devices are updated when there is something to write or a blink
+phase changes. Due devices are served by priority, see USBSimDevice.set_poll().
+=============================================================================================="""
+
+from time import monotonic
+from USBSimDevice import USBSimDevice, METH, PRIO
+from USBSimMetrics import label
+
+# Highest poll rate (Hz) of a device with reports, unless set by set_poll()
+POLL_RATE = 500.0
+# Longest poll interval (s) of an idle device without latency budget
+IDLE_INTERVAL = 0.1
+# Growth of the poll interval per idle poll
+BACKOFF = 1.5
+# Weight of a new measurement in the observed report interval
+SMOOTHING = 0.2
+# Devices below PRIO.HIGH are deferred to the next step once a step has taken this long (s)
+STEP_BUDGET = 0.005
+
+_READS = METH.READ | METH.READ_FEATURE | METH.READ_LAST | METH.READ_ALL
+
+
+class _Poll:
+    """Scheduling state of one device.
+    """
+    __slots__ = ("device", "due", "interval", "report_interval", "last_report", "pending", "polls", "reports")
+
+    def __init__(self, device, now):
+        self.device = device
+        self.due = now
+        self.interval = 0.0
+        self.report_interval = None
+        self.last_report = None
+        self.pending = 0
+        self.polls = 0
+        self.reports = 0
+
+
+class PollScheduler:
+    """Updates the devices when they are due and runs their actions when triggered.
+
+    Example:
+        scheduler = PollScheduler()
+        while True:
+            ... receive simvars ...
+            scheduler.run_for(0.01)
+            sc.flush()
+    """
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (list): devices to poll, defaults to USBSimDevice.Workers
+        """
+        self.workers = USBSimDevice.Workers if workers is None else workers
+        self._polls = {}
+
+    def _limits(self, device):
+        """Returns the shortest and the longest poll interval of a device.
+        """
+        shortest = 1.0 / (device.poll_rate or POLL_RATE)
+        longest = IDLE_INTERVAL if device.poll_latency is None else min(IDLE_INTERVAL, device.poll_latency)
+        return shortest, max(shortest, longest)
+
+    def _deadline(self, poll):
+        """Returns the time the device has to be updated next.
+        """
+        device = poll.device
+        if device.status != USBSimDevice.STAT_OK:
+            # reconnect attempts are rate limited by the device itself
+            return poll.due
+        reports, simvars = device.pending_work()
+        if reports or simvars > poll.pending:
+            # reports of the reader thread or new simvar changes
+            return 0.0
+        # pending writes or the next change of a blink phase
+        outputs = device.next_due(monotonic())
+        return poll.due if outputs is None else min(poll.due, outputs)
+
+    def _poll(self, poll, now):
+        """Updates one device, runs its actions and adapts its poll interval.
+        """
+        device = poll.device
+        device.update()
+        poll.polls += 1
+        got = device.readbuffer is not device.old_readbuffer
+        if device.triggered():
+            device.actions()
+        # simvars left pending by the actions do not make the device due again
+        poll.pending = device.pending_work()[1]
+        shortest, longest = self._limits(device)
+        if not device.method & _READS:
+            # nothing to read, only writes and blinking need updates
+            poll.interval = longest
+        elif got:
+            poll.reports += 1
+            if poll.last_report is not None:
+                measured = now - poll.last_report
+                poll.report_interval = measured if poll.report_interval is None else \
+                    poll.report_interval + SMOOTHING * (measured - poll.report_interval)
+            poll.last_report = now
+            # poll twice per expected report, not faster than the device's rate
+            expected = poll.report_interval if poll.report_interval is not None else shortest
+            poll.interval = min(max(expected / 2, shortest), longest)
+        else:
+            poll.interval = min(max(poll.interval, shortest) * BACKOFF, longest)
+        poll.due = now + poll.interval
+
+    def step(self):
+        """Updates all due devices, by priority.
+
+        Returns:
+            float: time in seconds until the next device is due
+        """
+        now = monotonic()
+        polls = self._polls
+        if len(polls) != len(self.workers):
+            self._polls = polls = {device: polls.get(device) or _Poll(device, now) for device in self.workers}
+        due = [(poll.device.poll_priority, deadline, poll)
+               for poll in polls.values() for deadline in (self._deadline(poll),) if deadline <= now]
+        due.sort(key=lambda entry: entry[:2])
+        start = now
+        for priority, deadline, poll in due:
+            if priority > PRIO.HIGH and now - start > STEP_BUDGET:
+                # leave the rest to the next step, flight controls come first
+                break
+            self._poll(poll, now)
+            now = monotonic()
+        return max(0.0, min((self._deadline(poll) for poll in polls.values()), default=now + IDLE_INTERVAL) - monotonic())
+
+    def run_for(self, duration):
+        """Runs steps for the given time, waiting while no device is due. Reports of devices in threaded mode end the wait
+        early, see USBSimDevice.wait().
+
+        Args:
+            duration (float): time in seconds, i.e. until SimConnect is due again
+        """
+        end = monotonic() + duration
+        while True:
+            wait = self.step()
+            remaining = end - monotonic()
+            if remaining <= 0:
+                return
+            USBSimDevice.wait(min(wait, remaining))
+
+    def report(self):
+        """Returns the current poll interval (ms), polls and reports per device, keyed by USBSimMetrics.label() with
+        the index in workers.
+        """
+        return {label(device, i): {"interval_ms": p.interval * 1000, "polls": p.polls, "reports": p.reports}
+                for i, device in enumerate(self.workers) for p in (self._polls.get(device),) if p is not None}
@@ -0,0 +1,370 @@
+""" =============================================================================================
+USBSimShard
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+v1.1 / 16.10.2026 Polling shards update their devices every POLL_WAIT
+v1.2 / 16.10.2026 Only counters and status in shared memory, wrapping counters
+
+Runs devices defined by profiles (see USBSimProfile) in several worker processes, so a slow
+transfer or a heavy actions() call only delays the devices of its own shard. The coordinator in
+the main process owns the SimConnect connection: it sends simvar snapshots to the shards and
+the events of their actions to SimConnect. The devices are driven by the shards alone, their
+buffers stay in the shard. Only the change counters of input reports and writes and the status
+of the devices live in shared memory, one block per shard, from where Coordinator.status() and
+other processes read them without involving the shard. The shards are spawned, they import the
+main module of the application again, which therefore has to run only under its __main__ guard.
+
+    if __name__ == '__main__':
+        coordinator = Coordinator(sc, simvars, split(profile_files, 2))
+        coordinator.start()
+        atexit.register(coordinator.stop)
+        while True:
+            ...
+            coordinator.distribute(changed)
+            coordinator.collect()
+            print(coordinator.status())
+=============================================================================================="""
+
+import importlib
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from time import monotonic
+from USBSimDevice import USBSimDevice
+import USBSimProfile
+
+# Block of a device: number of input reports, number of writes, status. The counters wrap around at COUNTER_MASK.
+BLOCK = struct.Struct('<IIB')
+COUNTER = struct.Struct('<I')
+COUNTER_MASK = 0xffffffff
+BLOCK_ALIGN = 8
+
+# Minimum time between restarts of a failed shard process (s)
+RESTART_DELAY = 1.0
+
+# Longest wait of a shard without reader threads for simvars between two update passes (s), like the
+# minimum wait of the main loop of main.py, so reports are read as they arrive
+POLL_WAIT = 0.001
+
+
+class SharedDevice:
+    """View onto the shared memory block of one device. Written by the shard process, read by any process attached to
+    the shared memory.
+    """
+    def __init__(self, buf, offset, name):
+        self.name = name
+        self._block = buf[offset:offset + BLOCK.size]
+        # totals of the wrapping counters as seen by this view, see counts()
+        self._seen = BLOCK.unpack_from(self._block)[:2]
+        self._totals = [0, 0]
+
+    def _fields(self):
+        return BLOCK.unpack_from(self._block)
+
+    @property
+    def status(self):
+        return self._fields()[2]
+
+    def counts(self):
+        """Returns the numbers of input reports and writes counted since this view was created. The counters in shared
+        memory wrap around, they must be read at least once per 2**32 reports.
+        """
+        fields = self._fields()
+        for i in (0, 1):
+            self._totals[i] += (fields[i] - self._seen[i]) & COUNTER_MASK
+        self._seen = fields[:2]
+        return tuple(self._totals)
+
+    def _count(self, offset):
+        COUNTER.pack_into(self._block, offset, (COUNTER.unpack_from(self._block, offset)[0] + 1) & COUNTER_MASK)
+
+    def count_input(self):
+        """Counts a new input report.
+        """
+        self._count(0)
+
+    def count_output(self):
+        """Counts a write to the device.
+        """
+        self._count(COUNTER.size)
+
+    def publish_status(self, status):
+        self._block[2 * COUNTER.size] = status
+
+    def release(self):
+        self._block.release()
+
+
+def layout(profiles):
+    """Returns the offsets of the device blocks of a shard and the size of its shared memory.
+    """
+    size = (BLOCK.size + BLOCK_ALIGN - 1) // BLOCK_ALIGN * BLOCK_ALIGN
+    return [i * size for i in range(len(profiles))], max(len(profiles) * size, 1)
+
+
+def _profiles(spec):
+    """Compiled profiles of a shard given as [(path, name), ...].
+    """
+    return [next(p for p in USBSimProfile.load(path) if p.name == name) for path, name in spec]
+
+
+def split(paths, count):
+    """Distributes the profiles of the given files round robin over count shards.
+
+    Returns:
+        list: per shard a list of (path, profile name)
+    """
+    profiles = [(path, profile.name) for path in paths for profile in USBSimProfile.load(path)]
+    shards = [profiles[i::count] for i in range(count)]
+    return [shard for shard in shards if shard]
+
+
+def simvar_groups(shards, groups=None):
+    """Adds the simvars of the shard profiles to groups {rate:[simvars]}, which defaults to the simvars of the devices
+    of this process. A simvar is subscribed in the rate class requested most often of those asked for it.
+    """
+    if groups is None:
+        groups = USBSimDevice.simvar_groups()
+    rates = {}
+    for rate, names in groups.items():
+        for name in names:
+            rates[name] = min(rate, rates.get(name, rate))
+    for spec in shards:
+        for profile in _profiles(spec):
+            for rate, names in profile.simvars:
+                for name in names:
+                    rates[name] = min(rate, rates.get(name, rate))
+    merged = {}
+    for name, rate in rates.items():
+        merged.setdefault(rate, []).append(name)
+    return merged
+
+
+def use_backend(module):
+    """Selects the backend of USBSimDevice by module name, i.e. as setup of a Coordinator:
+    functools.partial(use_backend, "USBSimHidraw").
+    """
+    USBSimDevice.Backend = importlib.import_module(module)
+
+
+class _EventSink:
+    """SimConnect stand in of a shard, collecting the events of the actions until they are sent to the coordinator.
+    """
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, event, value=0):
+        self.events.append((event, value))
+
+
+def _shard_main(spec, shm_name, conn, threaded, period, setup):
+    """Body of a shard process: runs the devices of its profiles, publishes their buffers and exchanges simvars and
+    events with the coordinator until it sends None.
+    """
+    # spawned processes share the resource tracker of the coordinator, which owns and unlinks the block
+    shm = shared_memory.SharedMemory(shm_name)
+    USBSimDevice.THREADED = threaded
+    if setup is not None:
+        setup()
+    profiles = _profiles(spec)
+    offsets, _ = layout(profiles)
+    views = [SharedDevice(shm.buf, offset, profile.name) for profile, offset in zip(profiles, offsets)]
+    sink = _EventSink()
+    simdata = {}
+    USBSimProfile.connect(sink, simdata)
+    devices = [USBSimProfile.create(profile) for profile in profiles]
+    written = [None] * len(devices)
+    try:
+        while True:
+            # simvar snapshots of the coordinator, also the wait of this loop
+            wait_for = 0 if threaded else min(period, POLL_WAIT)
+            while conn.poll(wait_for):
+                message = conn.recv()
+                if message is None:
+                    return
+                simdata.update(message)
+                USBSimDevice.dispatch_simvars(message)
+                wait_for = 0
+            for i, device in enumerate(devices):
+                device.update()
+                if device.triggered():
+                    device.actions()
+                view = views[i]
+                if device.readbuffer is not device.old_readbuffer:
+                    view.count_input()
+                if device._written is not written[i]:
+                    written[i] = device._written
+                    if written[i] is not None:
+                        view.count_output()
+                if view.status != device.status:
+                    view.publish_status(device.status)
+            if sink.events:
+                conn.send(sink.events)
+                sink.events = []
+            if threaded:
+                USBSimDevice.wait(period)
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        for device in devices:
+            device.stop()
+        for view in views:
+            view.release()
+        shm.close()
+
+
+class Shard:
+    """Shard process as seen by the coordinator.
+    """
+    def __init__(self, spec):
+        self.spec = spec
+        self.profiles = _profiles(spec)
+        self.offsets, self.size = layout(self.profiles)
+        self.shm = None
+        self.process = None
+        self.conn = None
+        self.simvars = set()
+        for profile in self.profiles:
+            for rate, names in profile.simvars:
+                self.simvars.update(names)
+        self.devices = []
+        self.restarts = 0
+        self.started = 0.0
+
+
+class Coordinator:
+    """Starts the shard processes and connects them to SimConnect.
+    """
+    def __init__(self, sc, simvars, shards, threaded=False, period=0.01, setup=None):
+        """
+        Args:
+            sc (SimConnect): connected client, i.e. an EventDispatcher, which receives the events of all shards
+            simvars: merged subscription of all simvars, see simvar_groups()
+            shards (list): per shard a list of (profile file, profile name), see split()
+            threaded (bool): run the devices of the shards in threaded mode
+            period (float): longest wait of a threaded shard for reports or simvars before updating its devices,
+                shards without reader threads wait at most POLL_WAIT
+            setup (callable): picklable function called in each shard process before creating the devices
+        """
+        self.sc = sc
+        self.simvars = simvars
+        self.shards = [Shard(spec) for spec in shards]
+        self.threaded = threaded
+        self.period = period
+        self.setup = setup
+        self._context = multiprocessing.get_context("spawn")
+
+    def _start(self, shard):
+        if shard.shm is None:
+            shard.shm = shared_memory.SharedMemory(create=True, size=shard.size)
+            shard.devices = [SharedDevice(shard.shm.buf, offset, profile.name)
+                             for profile, offset in zip(shard.profiles, shard.offsets)]
+        ours, theirs = self._context.Pipe()
+        process = self._context.Process(target=_shard_main, name="USBSimShard " + ",".join(n for _, n in shard.spec),
+                                        args=(shard.spec, shard.shm.name, theirs, self.threaded, self.period,
+                                              self.setup), daemon=True)
+        # spawned processes import the main module again, which must not run the application then, see main.py
+        process.start()
+        theirs.close()
+        shard.process = process
+        shard.conn = ours
+        shard.started = monotonic()
+        # a new process has no simvars yet
+        self._send(shard, shard.simvars)
+
+    def start(self):
+        """Starts all shard processes.
+        """
+        for shard in self.shards:
+            self._start(shard)
+
+    def _send(self, shard, names):
+        if shard.conn is None:
+            return
+        simdata = self.simvars.simdata
+        snapshot = {name: simdata[name] for name in names if name in simdata}
+        if snapshot:
+            try:
+                shard.conn.send(snapshot)
+            except (OSError, ValueError):
+                pass
+
+    def distribute(self, changed):
+        """Sends the values of changed simvars to the shards using them.
+
+        Args:
+            changed (iterable): names of the changed simvars, i.e. simdata.changedsince(latest)
+        """
+        changed = set(changed)
+        if not changed:
+            return
+        for shard in self.shards:
+            names = changed & shard.simvars
+            if names:
+                self._send(shard, names)
+
+    def collect(self, timeout=0):
+        """Sends the events of all shards to SimConnect and restarts failed shards.
+
+        Args:
+            timeout (float): maximum time to wait for events in seconds
+        Returns:
+            int: number of events received
+        """
+        count = 0
+        conns = {shard.conn: shard for shard in self.shards if shard.conn is not None}
+        for conn in wait(list(conns), timeout):
+            shard = conns[conn]
+            try:
+                while conn.poll():
+                    for event, value in conn.recv():
+                        self.sc.send_event(event, value)
+                        count += 1
+            except (EOFError, OSError):
+                conn.close()
+                shard.conn = None
+        now = monotonic()
+        for shard in self.shards:
+            if (shard.conn is None or not shard.process.is_alive()) and now - shard.started >= RESTART_DELAY:
+                # isolate the failure to the devices of this shard
+                if shard.process.is_alive():
+                    shard.process.kill()
+                if shard.conn is not None:
+                    shard.conn.close()
+                shard.restarts += 1
+                self._start(shard)
+        return count
+
+    def status(self):
+        """Returns the status and the numbers of input reports and writes of the devices of all shards, read from
+        shared memory and keyed by profile name.
+        """
+        result = {}
+        for shard in self.shards:
+            for view in shard.devices:
+                reports, writes = view.counts()
+                result[view.name] = {"status": view.status, "reports": reports, "writes": writes}
+        return result
+
+    def stop(self):
+        """Stops all shard processes and frees the shared memory.
+        """
+        for shard in self.shards:
+            if shard.conn is not None:
+                try:
+                    shard.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+        for shard in self.shards:
+            if shard.process is not None:
+                shard.process.join(1.0)
+                if shard.process.is_alive():
+                    shard.process.kill()
+            for view in shard.devices:
+                view.release()
+            shard.devices = []
+            if shard.shm is not None:
+                shard.shm.close()
+                shard.shm.unlink()
+                shard.shm = None
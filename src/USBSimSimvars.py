@@ -0,0 +1,73 @@
+""" =============================================================================================
+USBSimSimvars
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Subscribes the simvars of all devices in separate SimConnect subscriptions per rate class
+(see USBSimDevice.set_simvars) and merges them into one view, used like the simdata of a
+single pysimconnect subscription.
+=============================================================================================="""
+
+from USBSimDevice import USBSimDevice
+
+
+class MergedSimdata:
+    """Read only view over the simdata of several subscriptions, offering item access, latest() and changedsince().
+    """
+    def __init__(self, parts):
+        self.parts = list(parts)
+        self._owner = {}
+        for part, names in self.parts:
+            for name in names:
+                self._owner[name] = part
+
+    def __getitem__(self, name):
+        return self._owner[name][name]
+
+    def __contains__(self, name):
+        # a subscribed simvar is only contained once its first value has arrived
+        part = self._owner.get(name)
+        return part is not None and name in part
+
+    def get(self, name, default=None):
+        part = self._owner.get(name)
+        return default if part is None else part.get(name, default)
+
+    def latest(self):
+        """Returns a marker of the current state of all subscriptions, to be used with changedsince().
+        """
+        return tuple(part.latest() for part, _ in self.parts)
+
+    def changedsince(self, latest):
+        """Returns the names of all simvars changed since latest.
+        """
+        changed = []
+        for (part, _), mark in zip(self.parts, latest):
+            changed.extend(part.changedsince(mark))
+        return changed
+
+
+class MergedSubscription:
+    """Subscriptions of all rate classes, with the merged view in simdata like a pysimconnect subscription.
+    """
+    def __init__(self, subscriptions):
+        self.subscriptions = subscriptions
+        self.simdata = MergedSimdata((sub.simdata, names) for names, sub in subscriptions.values())
+
+
+def subscribe(sc, periods, groups=None):
+    """Subscribes each rate class of simvars with its own period.
+
+    Args:
+        sc (SimConnect): connected SimConnect client
+        periods (dict): {rate:dict of subscribe_simdata arguments}, i.e. {RATE.SLOW:dict(period=PERIOD_SECOND)}
+        groups (dict): {rate:[simvars]}, defaults to USBSimDevice.simvar_groups()
+    Returns:
+        MergedSubscription: merged subscription
+    """
+    if groups is None:
+        groups = USBSimDevice.simvar_groups()
+    subscriptions = {}
+    for rate, names in sorted(groups.items()):
+        subscriptions[rate] = (names, sc.subscribe_simdata(names, **periods[rate]))
+    return MergedSubscription(subscriptions)
@@ -0,0 +1,226 @@
+""" =============================================================================================
+USBSimStandin
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Local stand-in for the SimConnect client of pysimconnect, to run and measure the application
+without MSFS. Simvars are produced by scripted sources at their own rates, events are recorded
+with timestamps. StandinSimConnect offers the parts of SimConnect used here: subscribe_simdata(),
+receive() and send_event().
+
+    sc = StandinSimConnect({"AUTOPILOT MASTER": Steps((0, 1), 5.0),
+                            "INDICATED ALTITUDE": Wave(1000, 3000, 120.0)})
+    simvars = sc.subscribe_simdata(["AUTOPILOT MASTER", "INDICATED ALTITUDE"])
+=============================================================================================="""
+
+import copy
+import math
+import random
+from collections import Counter, deque
+from time import monotonic, monotonic_ns, sleep
+
+# Number of events kept in StandinSimConnect.events, older ones only count in the statistics
+EVENT_LOG = 100000
+
+# Constants of pysimconnect used with subscribe_simdata(), so the stand-in runs without it
+PERIOD_VISUAL_FRAME = 0x02
+PERIOD_SECOND = 0x04
+DATA_REQUEST_FLAG_CHANGED = 0x01
+DATA_REQUEST_FLAG_TAGGED = 0x02
+
+
+class Source:
+    """Simvar source calling function(t, rng) rate times per second, t being the time since the start in seconds.
+    """
+    def __init__(self, function, rate=1.0):
+        self.function = function
+        self.rate = rate
+
+    def value(self, t, rng):
+        return self.function(t, rng)
+
+
+class Constant(Source):
+    """Simvar that never changes.
+    """
+    def __init__(self, value):
+        super().__init__(lambda t, rng: value, 0.0)
+
+
+class Wave(Source):
+    """Sine between low and high with the given period in seconds.
+    """
+    def __init__(self, low, high, period, rate=30.0):
+        center, amplitude = (low + high) / 2, (high - low) / 2
+        super().__init__(lambda t, rng: center + amplitude * math.sin(2 * math.pi * t / period), rate)
+
+
+class Steps(Source):
+    """Cycles through values, changing every period seconds, i.e. Steps((0, 1), 2.0) toggles every 2 s.
+    """
+    def __init__(self, values, period):
+        values = tuple(values)
+        super().__init__(lambda t, rng: values[int(t / period) % len(values)], 1.0 / period)
+
+
+class RandomWalk(Source):
+    """Random walk between low and high, moving by at most step rate times per second.
+    """
+    def __init__(self, low, high, step, rate=5.0):
+        super().__init__(None, rate)
+        self.low, self.high, self.step = low, high, step
+        self.current = None
+
+    def value(self, t, rng):
+        if self.current is None:
+            self.current = (self.low + self.high) / 2
+        self.current = min(self.high, max(self.low, self.current + rng.uniform(-self.step, self.step)))
+        return self.current
+
+
+class StandinSimdata:
+    """Values of one subscription, used like pysimconnect simdata: item access, latest() and changedsince().
+    """
+    def __init__(self, names):
+        self.values = dict.fromkeys(names, 0.0)
+        self._version = 0
+        self._changed = {}
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def __contains__(self, name):
+        return name in self.values
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def latest(self):
+        """Returns a marker of the current state, to be used with changedsince().
+        """
+        return self._version
+
+    def changedsince(self, latest):
+        """Returns the names of all simvars changed since latest.
+        """
+        return [name for name, version in self._changed.items() if version > latest]
+
+    def _set(self, name, value):
+        if self.values.get(name) != value:
+            self._version += 1
+            self.values[name] = value
+            self._changed[name] = self._version
+
+
+class StandinSubscription:
+    """Result of subscribe_simdata(), updated every interval + 1 frames.
+    """
+    def __init__(self, names, interval):
+        self.names = list(names)
+        self.interval = max(0, interval)
+        self.simdata = StandinSimdata(self.names)
+
+
+class StandinSimConnect:
+    """SimConnect stand-in with scripted simvars and an event sink.
+    """
+    def __init__(self, script=None, default=None, frame_rate=30.0, seed=None, on_event=None):
+        """
+        Args:
+            script (dict): {simvar:Source or value}, values being constant
+            default (Source): source of subscribed simvars missing in the script, copied per simvar, None keeps them at 0
+            frame_rate (float): simulated frames per second, subscriptions are updated once per frame at most
+            seed (int): seed of the random sources, for reproducible runs
+            on_event (callable): called with (ns, event, value) for every event
+        """
+        self.script = {name: source if isinstance(source, Source) else Constant(source)
+                       for name, source in (script or {}).items()}
+        self.default = default
+        self.frame_rate = frame_rate
+        self.on_event = on_event
+        self.subscriptions = []
+        self.events = deque(maxlen=EVENT_LOG)
+        self.counts = Counter()
+        self.values = {}
+        self.frames = 0
+        self._rng = random.Random(seed)
+        self._start = monotonic()
+        self._next_frame = self._start
+        self._due = {}
+        self._sources = {}
+
+    def subscribe_simdata(self, names, period=None, interval=0, **kwargs):
+        """Subscribes simvars like SimConnect.subscribe_simdata. The period and flags are not simulated, like in
+        SimConnect interval frames are skipped between two updates of the subscription.
+        """
+        subscription = StandinSubscription(names, interval)
+        for name in subscription.names:
+            if name not in self._sources:
+                source = self.script.get(name)
+                if source is None and self.default is not None:
+                    source = copy.copy(self.default)
+                if source is not None:
+                    self._sources[name] = source
+                    self._due[name] = self._start
+        self.subscriptions.append(subscription)
+        self._update(monotonic())
+        return subscription
+
+    def set(self, name, value):
+        """Sets a simvar right away, i.e. from a test script.
+        """
+        self.values[name] = value
+        for subscription in self.subscriptions:
+            if name in subscription.simdata:
+                subscription.simdata._set(name, value)
+
+    def _update(self, now):
+        t = now - self._start
+        for name, source in self._sources.items():
+            due = self._due[name]
+            if due is not None and now >= due:
+                self.values[name] = source.value(t, self._rng)
+                self._due[name] = now + 1.0 / source.rate if source.rate else None
+        for subscription in self.subscriptions:
+            if self.frames % (subscription.interval + 1) == 0:
+                simdata = subscription.simdata
+                for name in subscription.names:
+                    if name in self.values:
+                        simdata._set(name, self.values[name])
+
+    def receive(self, timeout_seconds=0):
+        """Simulates the frames due, waiting at most timeout_seconds for the next one.
+
+        Returns:
+            bool: True if at least one frame was simulated
+        """
+        now = monotonic()
+        if now < self._next_frame:
+            if timeout_seconds <= 0:
+                return False
+            sleep(min(timeout_seconds, self._next_frame - now))
+            now = monotonic()
+            if now < self._next_frame:
+                return False
+        self.frames += 1
+        self._update(now)
+        # do not catch up on frames missed by a slow loop
+        self._next_frame = max(self._next_frame + 1.0 / self.frame_rate, now)
+        return True
+
+    def send_event(self, event, value=0):
+        """Records an event with its time in monotonic ns.
+        """
+        stamp = monotonic_ns()
+        self.events.append((stamp, event, value))
+        self.counts[event] += 1
+        if self.on_event is not None:
+            self.on_event(stamp, event, value)
+
+    def stats(self):
+        """Returns the event counts and throughput since the start.
+        """
+        elapsed = monotonic() - self._start
+        total = sum(self.counts.values())
+        return {"seconds": elapsed, "frames": self.frames, "events": total,
+                "events_per_second": total / elapsed if elapsed else 0.0, "by_event": dict(self.counts)}
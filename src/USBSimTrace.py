@@ -0,0 +1,127 @@
+""" =============================================================================================
+USBSimTrace
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+v1.1 / 16.10.2026 Origin kept per thread and asyncio task
+
+Optional end to end latency tracing. Input reports are stamped when read, simvar changes when
+dispatched to the devices. input_ios(), input_batch() and changed_simvars() make the stamp the
+origin of what the actions do next: events sent by EventDispatcher.flush() and writes to the
+device are recorded as spans from their origin. Spans are kept in a bounded ring buffer and can
+be exported in the Chrome trace format (chrome://tracing, Perfetto).
+
+    tracer = USBSimTrace.enable()
+    ...
+    tracer.export("trace.json")
+=============================================================================================="""
+
+import contextvars
+import json
+from collections import deque
+from USBSimMetrics import Histogram
+
+# Active tracer, None while tracing is off
+tracer = None
+
+# Origin of the running actions, kept per thread and asyncio task, see Tracer.origin
+_origin = contextvars.ContextVar("origin", default=None)
+
+
+class Tracer:
+    """Ring buffer of spans (name, category, start ns, end ns, track, args), track being the device.
+    """
+    def __init__(self, size=16384):
+        """
+        Args:
+            size (int): number of spans kept, older ones are dropped
+        """
+        self.spans = deque(maxlen=size)
+        self.latency = {}
+
+    @property
+    def origin(self):
+        """(kind, stamp ns, device) of the report or simvar change the running actions react to. It is kept per thread
+        and asyncio task, so updates running in an executor do not change the origin of actions running elsewhere.
+        """
+        return _origin.get()
+
+    @origin.setter
+    def origin(self, value):
+        _origin.set(value)
+
+    def span(self, name, category, start, end, track, args=None):
+        """Records a span, and its duration in the latency histogram of its category.
+
+        Args:
+            name (str): name of the span, i.e. the event
+            category (str): kind of latency, i.e. "report>event"
+            start (int): start in monotonic ns
+            end (int): end in monotonic ns
+            track: device the span belongs to
+            args (dict): additional values shown with the span
+        """
+        self.spans.append((name, category, start, end, track, args))
+        histogram = self.latency.get(category)
+        if histogram is None:
+            histogram = self.latency[category] = Histogram()
+        histogram.add(end - start)
+
+    def set_origin(self, kind, stamp, device):
+        """Makes a report or simvar change the origin of the following events and writes.
+        """
+        if stamp:
+            self.origin = (kind, stamp, device)
+
+    def summary(self):
+        """Returns the latency statistics per category.
+        """
+        return {category: histogram.snapshot() for category, histogram in self.latency.items()}
+
+    def chrome_trace(self):
+        """Returns the spans in the Chrome trace event format, one thread per device.
+        """
+        events = []
+        tracks = {}
+        for name, category, start, end, track, args in self.spans:
+            tid = tracks.get(track)
+            if tid is None:
+                tid = tracks[track] = len(tracks) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": _label(track)}})
+            event = {"name": name, "cat": category, "ph": "X", "pid": 1, "tid": tid, "ts": start / 1000,
+                     "dur": (end - start) / 1000}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"latency": self.summary()}}
+
+    def export(self, path):
+        """Writes chrome_trace() as json to a file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _label(track):
+    if track is None:
+        return "SimConnect"
+    name = getattr(track, "name", None)
+    if name:
+        return name
+    return f"{track.vendor_id:04x}:{track.product_id:04x}:{track.interface}"
+
+
+def enable(size=16384):
+    """Starts tracing into a new Tracer and returns it.
+    """
+    global tracer
+    tracer = Tracer(size)
+    return tracer
+
+
+def disable():
+    """Stops tracing, returns the last Tracer.
+    """
+    global tracer
+    last, tracer = tracer, None
+    return last
+
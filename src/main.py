@@ -9,352 +9,500 @@ v0.5 / 24.05.2024 Updated Contour Pro
 v0.6 / 02.06.2024 Added CHflight
 v0.7 / 07.06.2024 Added Command line options
 v1.0 / 08.06.2024 Production ready
+v1.1 / 16.10.2026 Added threaded mode option
+v1.2 / 16.10.2026 Added asyncio mode option
+v1.3 / 16.10.2026 Added metrics option
+v1.4 / 16.10.2026 Events batched per frame, fixed CHflight inputs
+v1.5 / 16.10.2026 Simvar changes per device, actions only when triggered
+v1.6 / 16.10.2026 Simvars subscribed by rate class
+v1.7 / 16.10.2026 Contour and Saitek Autopilot read all reports, no lost encoder steps
+v1.8 / 16.10.2026 Added native hidraw option
+v1.9 / 16.10.2026 MFT Challange Disk and CHflight use axis processing
+v1.10 / 16.10.2026 Added device profiles, CHflight defined by a profile
+v1.11 / 16.10.2026 Added option to run profile devices in several processes
+v1.12 / 16.10.2026 Added adaptive polling option, poll priorities of the devices
+v1.13 / 16.10.2026 Added latency tracing option
+v1.14 / 16.10.2026 Added SimConnect stand-in option, backoff when connecting
+v1.15 / 16.10.2026 Saitek AP displays with cached rendering, bottom row at its own position
+v1.16 / 16.10.2026 Added option to decode the inputs of all devices at once with NumPy
+v1.17 / 16.10.2026 Added option to profile actions and updates against a time budget, device names
+v1.18 / 16.10.2026 Values kept by actions declared as device state
+v1.19 / 16.10.2026 Safe to import by spawned shard processes
 
 Sample application using USBSimDevice to configure different non-standard USB devices for
 use with MSFS 2020 interacting through pysimconnect.
 =============================================================================================="""
 
-from USBSimDevice import USBSimDevice, METH, IO
-from simconnect import SimConnect, PERIOD_VISUAL_FRAME
-from time import sleep, time
+from USBSimDevice import USBSimDevice, METH, IO, RATE, PRIO
+from USBSimEvents import EventDispatcher
+from USBSimAxis import Axis
+from USBSimDisplay import Display, SegmentFormat
+import USBSimProfile
+import USBSimSimvars
+from time import sleep, monotonic
+import json
 import argparse
+import multiprocessing
+import os
 import sys
 
-####################################
-##### Hardware Definition here #####
-####################################
-
-# Set command line options to switch on supported devices
-parser = argparse.ArgumentParser(prog='USBSimActions')
-
-parser.add_argument('-Contour', dest='Contour', action='store_true', help='Use Contour Pro as input device for Garmin G1000 system')
-parser.add_argument('-Velone', dest='Velone', action='store_true',  help='Define annunciator lights at Velocity One Pro flightstick')
-parser.add_argument('-SaitekAP', dest='SaitekAP', action='store_true', help='Use Saitek / Logitech Multipanel to control and display autopilot')
-parser.add_argument('-SaitekSW', dest='SaitekSW', action='store_true', help='Define actions for Saitek Switchpanel')
-parser.add_argument('-MFTChallange', dest='MFTChallange', action='store_true', help='Use MFT Challange Disk to controll aileron and elevator by balancing')
-parser.add_argument('-CHflight', dest='CHflight', action='store_true', help='Use buttons and hat on analog joystick')
-
-Activate = vars(parser.parse_args())
-
-# If no arguments are provided, eihter show help when run from pyinstaller, or use default values.
-if not any(Activate.values()):
-    if getattr(sys, 'frozen', False):
-        parse_args(['-h'])
-    else:
-        Activate["Contour"] = True
-        Activate["Velone"] = True
-        Activate["SaitekAP"] = True
-
-# Hardwaredefinition Contour
-
-if Activate.get("Contour"):
-
-    def ActionContour(self):
-        # process buttons
-        ins = self.input_ios()
-        if ins["Index"]: sc.send_event('MobiFlight.AS1000_PFD_DIRECTTO')
-        if ins["Middle"]: sc.send_event('MobiFlight.AS1000_PFD_ENT_Push')
-        if ins["Ring"]: sc.send_event('MobiFlight.AS1000_PFD_CLR')
-        if ins["Thumb"]: sc.send_event('MobiFlight.AS1000_PFD_FMS_Lower_DEC')
-        if ins["Pinky"]: sc.send_event('MobiFlight.AS1000_PFD_FMS_Lower_INC')
-        if ins["Inner"]:
-            if ins["Inner"]-self.inner_prev < -2:
-                sc.send_event('MobiFlight.AS1000_PFD_FMS_Upper_INC')
-            elif ins["Inner"]-self.inner_prev < 0:
-                sc.send_event('MobiFlight.AS1000_PFD_FMS_Upper_DEC')
-            elif ins["Inner"]-self.inner_prev > 2:
-                sc.send_event('MobiFlight.AS1000_PFD_FMS_Upper_DEC')
-            elif ins["Inner"]-self.inner_prev > 0:
-                sc.send_event('MobiFlight.AS1000_PFD_FMS_Upper_INC')
-            self.inner_prev = ins["Inner"]
-        if ins["Outer"]:
-            if ins["Outer"]>0 and ins["Outer"]>self.outer_prev:
-                sc.send_event('MobiFlight.AS1000_MFD_RANGE_DEC')
-            elif ins["Outer"]<0 and ins["Outer"]<self.outer_prev:
-                sc.send_event('MobiFlight.AS1000_MFD_RANGE_INC')
-            self.outer_prev = ins["Outer"]
-        
-    Contour = USBSimDevice(0x0b33, 0x0020, 0, METH.READ)
-    Contour.set_inputs([IO("Outer", 0,-7), IO("Inner", 1,8), IO("Thumb",3,4), IO("Index",3,5), IO("Middle",3,6), IO("Ring",3,7), IO("Pinky",4,0)])
-    Contour.set_actions(ActionContour)
-    # Instance Variables for previous position of the scroll wheels
-    Contour.inner_prev = 0
-    Contour.outer_prev = 0
-
-# Hardwaredefinition Turtle Beach VelocitiyOne Flight Pro
-
-VELONE_OFF, VELONE_RED, VELONE_GREEN, VELONE_YELLOW, VELONE_BLUE, VELONE_WHITE = 1, 2, 3, 4, 5, 6
-
-if Activate.get("Velone"):
-
-    def ActionVelone(self):
-        if simvarsChanged:
+# Spawned shard processes import this program again, they must neither open devices nor connect to SimConnect
+if __name__ == '__main__':
+    # Shard processes of a frozen build start this program again, let them run their shard instead
+    multiprocessing.freeze_support()
+
+    ####################################
+    ##### Hardware Definition here #####
+    ####################################
+
+    # Set command line options to switch on supported devices
+    parser = argparse.ArgumentParser(prog='USBSimActions')
+
+    parser.add_argument('-Contour', dest='Contour', action='store_true', help='Use Contour Pro as input device for Garmin G1000 system')
+    parser.add_argument('-Velone', dest='Velone', action='store_true',  help='Define annunciator lights at Velocity One Pro flightstick')
+    parser.add_argument('-SaitekAP', dest='SaitekAP', action='store_true', help='Use Saitek / Logitech Multipanel to control and display autopilot')
+    parser.add_argument('-SaitekSW', dest='SaitekSW', action='store_true', help='Define actions for Saitek Switchpanel')
+    parser.add_argument('-MFTChallange', dest='MFTChallange', action='store_true', help='Use MFT Challange Disk to controll aileron and elevator by balancing')
+    parser.add_argument('-CHflight', dest='CHflight', action='store_true', help='Use buttons and hat on analog joystick')
+    parser.add_argument('-Threaded', dest='Threaded', action='store_true', help='Read devices in background threads instead of polling')
+    parser.add_argument('-Async', dest='Async', action='store_true', help='Drive devices from an asyncio event loop')
+    parser.add_argument('-Hidraw', dest='Hidraw', action='store_true', help='Open /dev/hidraw nodes directly and wait for all devices with epoll (Linux)')
+    parser.add_argument('-Profile', dest='Profile', action='append', default=[], metavar='FILE', help='Define devices by a JSON or TOML profile, can be repeated')
+    parser.add_argument('-Adaptive', dest='Adaptive', action='store_true', help='Poll each device as often as its reports require')
+    parser.add_argument('-Shards', dest='Shards', type=int, default=0, metavar='N', help='Run the devices defined by profiles in N processes')
+    parser.add_argument('-Trace', dest='Trace', metavar='FILE', help='Trace latencies from reports and simvar changes to events and writes, written to FILE at exit')
+    parser.add_argument('-Standin', dest='Standin', action='store_true', help='Run against a local SimConnect stand-in with synthetic simvars, print event statistics at exit')
+    parser.add_argument('-Vectorized', dest='Vectorized', action='store_true', help='Decode the inputs of all devices at once with NumPy')
+    parser.add_argument('-Budget', dest='Budget', type=float, default=0, metavar='MS', help='Profile actions and updates, report calls over MS milliseconds and print a profile per device at exit')
+    parser.add_argument('-Metrics', dest='Metrics', type=float, default=0, metavar='SECONDS', help='Print device metrics as json every SECONDS')
+
+    Activate = vars(parser.parse_args())
+    # Options that are not devices
+    Threaded = Activate.pop('Threaded')
+    Async = Activate.pop('Async')
+    Metrics = Activate.pop('Metrics')
+    Hidraw = Activate.pop('Hidraw')
+    Shards = Activate.pop('Shards')
+    Adaptive = Activate.pop('Adaptive')
+    Trace = Activate.pop('Trace')
+    Standin = Activate.pop('Standin')
+    Vectorized = Activate.pop('Vectorized')
+    Budget = Activate.pop('Budget')
+    Profiles = Activate.pop('Profile')
+    # Profiles of devices selected by their option
+    PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+    USBSimDevice.THREADED = Threaded or Async
+    if Hidraw:
+        import USBSimHidraw
+        USBSimDevice.Backend = USBSimHidraw
+
+    # If no arguments are provided, eihter show help when run from pyinstaller, or use default values.
+    if not any(Activate.values()) and not Profiles:
+        if getattr(sys, 'frozen', False):
+            parser.parse_args(['-h'])
+        else:
+            Activate["Contour"] = True
+            Activate["Velone"] = True
+            Activate["SaitekAP"] = True
+
+    # Hardwaredefinition Contour
+
+    if Activate.get("Contour"):
+
+        def ActionContour(self):
+            # process all reports since the last call
+            ins = self.input_batch()
+            def presses(name):
+                return ins[name].presses if name in ins else 0
+            if presses("Index"): sc.send_event('MobiFlight.AS1000_PFD_DIRECTTO')
+            if presses("Middle"): sc.send_event('MobiFlight.AS1000_PFD_ENT_Push')
+            if presses("Ring"): sc.send_event('MobiFlight.AS1000_PFD_CLR')
+            if presses("Thumb"): sc.send_event('MobiFlight.AS1000_PFD_FMS_Lower_DEC')
+            if presses("Pinky"): sc.send_event('MobiFlight.AS1000_PFD_FMS_Lower_INC')
+            if "Inner" in ins:
+                # one event per step of the wheel, the counter wraps around
+                steps = ins["Inner"].delta
+                for i in range(abs(steps)):
+                    sc.send_event('MobiFlight.AS1000_PFD_FMS_Upper_INC' if steps > 0 else 'MobiFlight.AS1000_PFD_FMS_Upper_DEC')
+            if "Outer" in ins:
+                outer = ins["Outer"].value
+                if outer>0 and outer>self.state.outer_prev:
+                    sc.send_event('MobiFlight.AS1000_MFD_RANGE_DEC')
+                elif outer<0 and outer<self.state.outer_prev:
+                    sc.send_event('MobiFlight.AS1000_MFD_RANGE_INC')
+                self.state.outer_prev = outer
+
+        # State holds the previous position of the shuttle wheel
+        Contour = USBSimDevice(0x0b33, 0x0020, 0, METH.READ_ALL, state=dict(outer_prev=0))
+        Contour.name = "Contour"
+        Contour.set_inputs([IO("Outer", 0,-7), IO("Inner", 1,8), IO("Thumb",3,4), IO("Index",3,5), IO("Middle",3,6), IO("Ring",3,7), IO("Pinky",4,0)])
+        Contour.set_actions(ActionContour)
+
+    # Hardwaredefinition Turtle Beach VelocitiyOne Flight Pro
+
+    VELONE_OFF, VELONE_RED, VELONE_GREEN, VELONE_YELLOW, VELONE_BLUE, VELONE_WHITE = 1, 2, 3, 4, 5, 6
+
+    if Activate.get("Velone"):
+
+        def ActionVelone(self):
+            changed = self.changed_simvars()
+            data = simvars.simdata
             # Landing Gear
-            if simvars.simdata['GEAR LEFT POSITION']>0.95 and simvars.simdata['GEAR RIGHT POSITION']>0.95 and simvars.simdata['GEAR CENTER POSITION']>0.95:
-                self.output_io("X2Y1", VELONE_GREEN)
-                self.blink_off("X2Y1")
-            elif simvars.simdata['GEAR LEFT POSITION']<0.05 and simvars.simdata['GEAR RIGHT POSITION']<0.05 and simvars.simdata['GEAR CENTER POSITION']<0.05:
-                self.output_io("X2Y1", VELONE_OFF)
-                self.blink_off("X2Y1")
-            else:
-                self.output_io("X2Y1", VELONE_YELLOW)
-                self.blink_on("X2Y1",VELONE_RED)
+            if changed & {'GEAR LEFT POSITION', 'GEAR RIGHT POSITION', 'GEAR CENTER POSITION'}:
+                if data['GEAR LEFT POSITION']>0.95 and data['GEAR RIGHT POSITION']>0.95 and data['GEAR CENTER POSITION']>0.95:
+                    self.output_io("X2Y1", VELONE_GREEN)
+                    self.blink_off("X2Y1")
+                elif data['GEAR LEFT POSITION']<0.05 and data['GEAR RIGHT POSITION']<0.05 and data['GEAR CENTER POSITION']<0.05:
+                    self.output_io("X2Y1", VELONE_OFF)
+                    self.blink_off("X2Y1")
+                else:
+                    self.output_io("X2Y1", VELONE_YELLOW)
+                    self.blink_on("X2Y1",VELONE_RED)
             # Autopilot
-            if simvars.simdata["AUTOPILOT MASTER"]:
-                self.output_io("X1Y3", VELONE_GREEN)
-            else:
-                self.output_io("X1Y3", VELONE_OFF)
+            if "AUTOPILOT MASTER" in changed:
+                if data["AUTOPILOT MASTER"]:
+                    self.output_io("X1Y3", VELONE_GREEN)
+                else:
+                    self.output_io("X1Y3", VELONE_OFF)
             # Parking Brakes
-            if simvars.simdata["BRAKE PARKING INDICATOR"]:
-                self.output_io("X1Y1", VELONE_RED)
-            else:
-                self.output_io("X1Y1", VELONE_OFF)
+            if "BRAKE PARKING INDICATOR" in changed:
+                if data["BRAKE PARKING INDICATOR"]:
+                    self.output_io("X1Y1", VELONE_RED)
+                else:
+                    self.output_io("X1Y1", VELONE_OFF)
             # Spoilers
-            if simvars.simdata['SPOILERS LEFT POSITION']>0.10 and simvars.simdata['SPOILERS RIGHT POSITION']>0.10:
-                self.output_io("X1Y2", VELONE_YELLOW)
-            else:
-                self.output_io("X1Y2", VELONE_OFF)  
+            if changed & {'SPOILERS LEFT POSITION', 'SPOILERS RIGHT POSITION'}:
+                if data['SPOILERS LEFT POSITION']>0.10 and data['SPOILERS RIGHT POSITION']>0.10:
+                    self.output_io("X1Y2", VELONE_YELLOW)
+                else:
+                    self.output_io("X1Y2", VELONE_OFF)
             # Stall Warning
-            if simvars.simdata['STALL WARNING']:
-                self.output_io("X2Y2", VELONE_RED)
-            else:
-                self.output_io("X2Y2", VELONE_OFF)
-
-    Velone = USBSimDevice(0x10f5, 0x7001, 0, METH.WRITE)
-    Velone.set_outputs([IO("X1Y1",  6,8), IO("X2Y1",  8,8), IO("X1Y2", 10,8), IO("X2Y2", 12,8), IO("X1Y3", 14,8), IO("X2Y3", 16,8),
-                        IO("X3Y1", 18,8), IO("X4Y1", 20,8), IO("X3Y2", 22,8), IO("X4Y2", 24,8), IO("X3Y3", 26,8), IO("X4Y3", 28,8)])
-    Velone.set_actions(ActionVelone)
-    Velone.set_simvars(['GEAR RIGHT POSITION', 'GEAR LEFT POSITION', 'GEAR CENTER POSITION', 'AUTOPILOT MASTER', 'BRAKE PARKING INDICATOR',
-                        'SPOILERS LEFT POSITION', 'SPOILERS RIGHT POSITION', 'STALL WARNING'])
-    Velone.output([ 3,  0,  0, 25,  1,  0,  1,  1,  1,  2,  1,  3,  1,  4,  1,  5,  1,  6,  1,  7,  1,  8,  1,  9,  1, 10,  1, 11,  1])
-
-# Hardwaredefinition MFT Challange Disk
-
-if Activate.get("MFTChallange"):
-    
-    DUmin, DUmax, DUcen = 400, 600, 500 # range down up before calibration
-    RLmin, RLmax, RLcen = 300, 500, 400 # range right left before calibration
-    DUfac, RLfac = 100, 100 # linear factor for disk->axis 
-    MFTChallangeCalibMode = True
-    MFTChallangeCalibDelay = 15 # calibrate during the first seconds
-    MFTChallangeCalibTime = int(time())
-
-    def ActionMFTChallange(self):
-        global DUmin, DUmax, DUcen, RLmin, RLmax, RLcen, MFTChallangeCalibMode, MFTChallangeCalibTime, DUfac, RLfac
-        ins = self.input_ios()
-        # If in calibration mode (first seconds) adjust min and max settings)
-        if MFTChallangeCalibMode:
-            for i in ins:
-                 if i == 'DU':
-                     DUmin = min(DUmin,ins['DU'])
-                     DUmax = max(DUmax,ins['DU'])
-                 if i == 'RL':
-                     RLmin = min(RLmin,ins['RL'])
-                     RLmax = max(RLmax,ins['RL'])
-            if MFTChallangeCalibTime + MFTChallangeCalibDelay < int(time()):
-                 MFTChallangeCalibMode = False
-                 DUcen = int((DUmin+DUmax)/2)
-                 DUfac = 16000/(DUmax-DUmin)
-                 RLcen = int((RLmin+RLmax)/2)
-                 RLfac = 16000/(RLmax-RLmin)
-                 print("Challange Disk calibrated!")
-        # Continue with regular tasks
-        for i in ins:
-            if i=="DU":
-                sc.send_event('ELEVATOR_SET', int((ins[i]-DUcen)*DUfac))
-            if i=="RL":
-                sc.send_event('AILERON_SET', int((ins[i]-RLcen)*RLfac))
-                
-    MFTChallange = USBSimDevice(0x17b5, 0x0010, 0, METH.READ_LAST)
-    MFTChallange.set_inputs([IO("DU", 0,16), IO("RL", 2,16)])
-    MFTChallange.set_actions(ActionMFTChallange)
-
-# Hardwaredefinition Saitek Autopilot Panel
-
-if Activate.get("SaitekAP"):
-
-    def saitek_num(value, digits=2):
-        # Format value for display on Saitek LCD screen
-        value = round(value/10**digits)*10**digits
-        stream = bytearray(str(value), encoding='utf-8')
-        formated = [0x0f,0x0f,0x0f,0x0f,0x0f]
-        streamlen = len(stream)-1
-        for i in range(streamlen+1):
-            if stream[streamlen-i]==45:
-                formated[4-i]=0xde
-            else:
-                formated[4-i]=stream[streamlen-i]-48
-        return (formated)
-    
-    def ActionSaitekAP(self):
-        global simvarsChanged
-        # process buttons
-        ins = self.input_ios()
-        if ins["DispALT"]: self.select=0;simvarsChanged=True
-        if ins["DispVS"]: self.select=1;simvarsChanged=True
-        if ins["DispIAS"]: self.select=2;simvarsChanged=True
-        if ins["DispHDG"]: self.select=3;simvarsChanged=True
-        if ins["DispCRS"]: self.select=4;simvarsChanged=True
-        if ins["B0"]: sc.send_event('AUTOPILOT_DISENGAGE_SET', 0);sc.send_event('AP_MASTER')
-        if ins["B1"]: sc.send_event('AP_HDG_HOLD')
-        if ins["B2"]: sc.send_event('AP_NAV1_HOLD')
-        if ins["B3"]: sc.send_event('AP_APR_HOLD')
-        if ins["B4"]: sc.send_event('AP_ALT_HOLD')
-        if ins["B5"]: sc.send_event('AP_VS_HOLD')
-        if ins["B6"]: pass # sc.send_event('')
-        if ins["B7"]: pass # sc.send_event('')
-        if ins["FlUP"]: sc.send_event('FLAPS_DECR')
-        if ins["FlDN"]: sc.send_event('FLAPS_INCR')
-        if ins["TrUP"]: sc.send_event('AP_VS_VAR_INC')
-        if ins["TrDN"]: sc.send_event('AP_VS_VAR_DEC')
-        if ins["TurnCW"] and (self.select==0 or self.select==1): sc.send_event('AP_ALT_VAR_INC')
-        if ins["TurnCCW"] and (self.select==0 or self.select==1): sc.send_event('AP_ALT_VAR_DEC')
-        if ins["TurnCW"] and self.select==3: sc.send_event('HEADING_BUG_INC')
-        if ins["TurnCCW"] and self.select==3: sc.send_event('HEADING_BUG_DEC')
-        # process simvar inputs to led and display
-        if simvarsChanged:
-            # Autopilot Master
-            if simvars.simdata["AUTOPILOT MASTER"]: self.output_io("Led0", 1)
-            else: self.output_io("Led0", 0)
-            # Heading Mode
-            if simvars.simdata["AUTOPILOT HEADING LOCK"]: self.output_io("Led1", 1)
-            else: self.output_io("Led1", 0)
-            # Nav Mode
-            if simvars.simdata["AUTOPILOT NAV1 LOCK"]: self.output_io("Led2", 1)
-            else: self.output_io("Led2", 0)
-            # Approach Mode
-            if simvars.simdata["AUTOPILOT APPROACH HOLD"]:
-                self.output_io("Led3", 1)
-                if simvars.simdata["AUTOPILOT APPROACH CAPTURED"]:
-                    self.blink_off("LED3")
+            if 'STALL WARNING' in changed:
+                if data['STALL WARNING']:
+                    self.output_io("X2Y2", VELONE_RED)
+                else:
+                    self.output_io("X2Y2", VELONE_OFF)
+
+        Velone = USBSimDevice(0x10f5, 0x7001, 0, METH.WRITE)
+        Velone.name = "Velone"
+        Velone.set_outputs([IO("X1Y1",  6,8), IO("X2Y1",  8,8), IO("X1Y2", 10,8), IO("X2Y2", 12,8), IO("X1Y3", 14,8), IO("X2Y3", 16,8),
+                            IO("X3Y1", 18,8), IO("X4Y1", 20,8), IO("X3Y2", 22,8), IO("X4Y2", 24,8), IO("X3Y3", 26,8), IO("X4Y3", 28,8)])
+        Velone.set_actions(ActionVelone)
+        # lights only, updated when there is something to write
+        Velone.set_poll(PRIO.LOW)
+        Velone.set_simvars(['GEAR RIGHT POSITION', 'GEAR LEFT POSITION', 'GEAR CENTER POSITION', 'SPOILERS LEFT POSITION', 'SPOILERS RIGHT POSITION'])
+        Velone.set_simvars(['AUTOPILOT MASTER', 'STALL WARNING'], RATE.ONCHANGE)
+        Velone.set_simvars(['BRAKE PARKING INDICATOR'], RATE.SLOW)
+        Velone.output([ 3,  0,  0, 25,  1,  0,  1,  1,  1,  2,  1,  3,  1,  4,  1,  5,  1,  6,  1,  7,  1,  8,  1,  9,  1, 10,  1, 11,  1])
+
+    # Hardwaredefinition MFT Challange Disk
+
+    if Activate.get("MFTChallange"):
+
+        def ActionMFTChallange(self):
+            # axes are calibrated during the first seconds and filtered, see set_inputs
+            ins = self.input_ios()
+            if ins["DU"] is not False: sc.send_event('ELEVATOR_SET', ins["DU"])
+            if ins["RL"] is not False: sc.send_event('AILERON_SET', ins["RL"])
+
+        MFTChallange = USBSimDevice(0x17b5, 0x0010, 0, METH.READ_LAST)
+        MFTChallange.name = "MFTChallange"
+        # range down up and right left before calibration, widened to the values seen during the first 15 seconds
+        MFTChallange.set_inputs([IO("DU", 0,16, Axis(400, 600, -8000, 8000, calibrate=15, median=3, threshold=32)),
+                                 IO("RL", 2,16, Axis(300, 500, -8000, 8000, calibrate=15, median=3, threshold=32))])
+        MFTChallange.set_actions(ActionMFTChallange)
+        MFTChallange.set_poll(PRIO.AXIS, latency=0.01)
+
+    # Hardwaredefinition Saitek Autopilot Panel
+
+    if Activate.get("SaitekAP"):
+
+        # Saitek LCD rows: altitude and vertical speed in hundreds, heading in degrees
+        SAITEK_HUNDREDS = SegmentFormat(5, digits=2)
+        SAITEK_UNITS = SegmentFormat(5)
+
+        def ActionSaitekAP(self):
+            # process buttons of all reports since the last call
+            ins = self.input_batch()
+            def presses(name):
+                return ins[name].presses if name in ins else 0
+            state = self.state
+            if presses("DispALT"): state.select=0;self.refresh_simvars()
+            if presses("DispVS"): state.select=1;self.refresh_simvars()
+            if presses("DispIAS"): state.select=2;self.refresh_simvars()
+            if presses("DispHDG"): state.select=3;self.refresh_simvars()
+            if presses("DispCRS"): state.select=4;self.refresh_simvars()
+            if presses("B0"): sc.send_event('AUTOPILOT_DISENGAGE_SET', 0);sc.send_event('AP_MASTER')
+            if presses("B1"): sc.send_event('AP_HDG_HOLD')
+            if presses("B2"): sc.send_event('AP_NAV1_HOLD')
+            if presses("B3"): sc.send_event('AP_APR_HOLD')
+            if presses("B4"): sc.send_event('AP_ALT_HOLD')
+            if presses("B5"): sc.send_event('AP_VS_HOLD')
+            if presses("B6"): pass # sc.send_event('')
+            if presses("B7"): pass # sc.send_event('')
+            if presses("FlUP"): sc.send_event('FLAPS_DECR')
+            if presses("FlDN"): sc.send_event('FLAPS_INCR')
+            if presses("TrUP"): sc.send_event('AP_VS_VAR_INC')
+            if presses("TrDN"): sc.send_event('AP_VS_VAR_DEC')
+            # one event per detent of the knob
+            for i in range(presses("TurnCW")):
+                if state.select==0 or state.select==1: sc.send_event('AP_ALT_VAR_INC')
+                if state.select==3: sc.send_event('HEADING_BUG_INC')
+            for i in range(presses("TurnCCW")):
+                if state.select==0 or state.select==1: sc.send_event('AP_ALT_VAR_DEC')
+                if state.select==3: sc.send_event('HEADING_BUG_DEC')
+            # process simvar inputs to led and display
+            if self.changed_simvars():
+                # Autopilot Master
+                if simvars.simdata["AUTOPILOT MASTER"]: self.output_io("Led0", 1)
+                else: self.output_io("Led0", 0)
+                # Heading Mode
+                if simvars.simdata["AUTOPILOT HEADING LOCK"]: self.output_io("Led1", 1)
+                else: self.output_io("Led1", 0)
+                # Nav Mode
+                if simvars.simdata["AUTOPILOT NAV1 LOCK"]: self.output_io("Led2", 1)
+                else: self.output_io("Led2", 0)
+                # Approach Mode
+                if simvars.simdata["AUTOPILOT APPROACH HOLD"]:
+                    self.output_io("Led3", 1)
+                    if simvars.simdata["AUTOPILOT APPROACH CAPTURED"]:
+                        self.blink_off("Led3")
+                    else:
+                        self.blink_on("Led3", 0)
                 else:
-                    self.blink_on("LED3", 0)
-            else:
-                self.output_io("Led3", 0)
-                self.blink_off("LED3")
-            # Altitude Hold Mode
-            if simvars.simdata["AUTOPILOT ALTITUDE LOCK"]: self.output_io("Led4", 1)
-            else: self.output_io("Led4", 0)
-            # Altitude Arm
-            if simvars.simdata["AUTOPILOT ALTITUDE ARM"]: self.output_io("Led4", 1)
-            else: self.output_io("Led4", 0)
-            # Vertical Speed engage
-            if simvars.simdata["AUTOPILOT VERTICAL HOLD"]: self.output_io("Led5", 1)
-            else: self.output_io("Led5", 0)
-            # default output empty display
-            self.output([0x0f,0x0f,0x0f,0x0f,0x0f],1)
-            self.output([0x0f,0x0f,0x0f,0x0f,0x0f],5)
-            # Vertical Speed Display
-            if simvars.simdata["AUTOPILOT VERTICAL HOLD"] and (self.select==0 or self.select==1):
-                self.output(saitek_num(simvars.simdata["AUTOPILOT VERTICAL HOLD VAR"]),5)
-            # Altitude Display
-            if self.select==0 or self.select==1:
-                self.output(saitek_num(simvars.simdata["AUTOPILOT ALTITUDE LOCK VAR"]),1)
-            # Heading Display
-            if self.select==3:
-                self.output(saitek_num(simvars.simdata["AUTOPILOT HEADING LOCK DIR"],0),1)
-
-    SaitekAP = USBSimDevice(0x06a3, 0x0d06, 0, METH.READ | METH.WRITE_FEATURE)
-    SaitekAP.set_inputs( [IO("DispALT", 0,0), IO("DispVS",  0,1), IO("DispIAS", 0,2), IO("DispHDG", 0,3), IO("DispCRS", 0,4), IO("TurnCW", 0,5), IO("TurnCCW", 0,6), IO("B0", 0,7),
-                          IO("B1",      1,0), IO("B2",      1,1), IO("B3",      1,2), IO("B4",      1,3), IO("B5",      1,4), IO("B6",     1,5), IO("B7",      1,6), IO("Arm", 1,7),
-                          IO("FlUP",    2,0), IO("FlDN",    2,1), IO("TrUP",    2,2), IO("TrDN",    2,3)])
-    SaitekAP.set_outputs([IO("Led0",  11,0), IO("Led1", 11,1), IO("Led2", 11,2), IO("Led3", 11,3), IO("Led4", 11,4), IO("Led5", 11,5), IO("Led6", 11,6), IO("Led7", 11,7)])
-    SaitekAP.set_actions(ActionSaitekAP)
-    SaitekAP.set_simvars(['AUTOPILOT MASTER', 'AUTOPILOT HEADING LOCK', 'AUTOPILOT NAV1 LOCK', 'AUTOPILOT APPROACH HOLD',
-                          'AUTOPILOT ALTITUDE LOCK', 'AUTOPILOT ALTITUDE ARM', 'AUTOPILOT VERTICAL HOLD', 'AUTOPILOT VERTICAL HOLD VAR',
-                          'AUTOPILOT ALTITUDE LOCK VAR', 'AUTOPILOT HEADING LOCK DIR', 'AUTOPILOT APPROACH CAPTURED'])
-    SaitekAP.output([1, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,  0, 0])
-    SaitekAP.select = 0 
-
-# Hardwaredefinition Saitek Switch Panel
-
-if Activate.get("SaitekSW"):
-
-    def ActionSaitekSW(self):
-        pass
-
-    SaitekSW = USBSimDevice(0x06a3, 0x0d05, 0,METH.READ | METH.WRITE)
-    SaitekSW.set_outputs([IO("Green N", 0,0), IO("Green L", 0,1), IO("Green R",  0,2), IO("Red N",     0,3), IO("Red L",   0,4), IO("Red R", 0,5)])
-    SaitekSW.set_inputs([ IO("BAT",     0,0), IO("ALT",     0,1), IO("AVIONICS", 0,2), IO("FUEL",      0,3), IO("DE-ICE",  0,4), IO("PITOT", 0,5), IO("COWL", 0,6), IO("PANEL", 0,7),
-                          IO("BEACON",  1,0), IO("NAV",     1,1), IO("STROBE",   1,2), IO("TAXI",      1,3), IO("LANDING", 1,4), IO("OFF",   1,5), IO("R",    1,6), IO("L",     1,7),
-                          IO("BOTH",    2,0), IO("START",   2,1), IO("GEAR UP",  2,2), IO("GEAR DOWN", 2,3)])
-    SaitekSW.set_actions(ActionSaitekSW)
-    SaitekSW.output([ 7])
-
-# Hardwaredefinition CH Flightstick Gameport using noname converter
-
-if Activate.get("CHflight"):
-
-    def ActionCHflight(self):
-        # process buttons
-        ins = self.input_ios()
-        if ins["Buttons"]==1:    pass # B1
-        elif ins["Buttons"]==4:  pass # B2
-        elif ins["Buttons"]==5:  pass # B3
-        elif ins["Buttons"]==9:  pass # B4
-        elif ins["Buttons"]==8:  pass # B5
-        elif ins["Buttons"]==2:  pass # B6
-        elif ins["Buttons"]==14: pass # Hat 1 Up
-        elif ins["Buttons"]==10: pass # Hat 1 Right
-        elif ins["Buttons"]==6:  pass # Hat 1 Down
-        elif ins["Buttons"]==12: pass # Hat 1 Left
-        elif ins["Buttons"]==15: pass # Hat 2 Up
-        elif ins["Buttons"]==11: pass # Hat 2 Right
-        elif ins["Buttons"]==7:  pass # Hat 2 Down
-        elif ins["Buttons"]==3:  pass # Hat 2 Left
-        # set axis
-        sc.send_event('ELEVATOR_SET', int((ins["Elevator"]-60)*260))
-        sc.send_event('AILERON_SET', int((ins["Aileron"]-80)*220))
-    
-    CHflight = USBSimDevice(0x079D, 0x0201, 0, METH.READ)
-    CHflight.set_inputs([IO("Aileron", 0, 8), IO("Elevator", 1, 8), IO("Throttle", 5, 8)], IO("Buttons", 4, 8))
-    CHflight.set_actions(ActionCHflight)
-
-# Hardwaredefinition add your Hardware here
-
-'''
-if Activate.get("XXX"):
-
-    def ActionXXX(self):
-        pass
-    
-    XXX = USBSimDevice(0x17b5, 0x0010, 0,METH.READ)
-    XXX.set_inputs([IO("LR", 0,16), IO("UD", 2,16)])
-    XXX.set_actions(ActionXXX)
-'''
-
-#######################
-##### Main Loop #######
-#######################
-
-def openSimConnect():
-    global simvars, sc
-    try:
-        sc = SimConnect()
-        simvars = sc.subscribe_simdata(USBSimDevice.Simvars, period=PERIOD_VISUAL_FRAME, interval=10)
-        return True
-    except:
-        return False
-
-# Try to connect to SimConnect
-while not openSimConnect():
-    pass
-# Main        
-while True:
-    
-    # Get Simconnect Data
-    latest = simvars.simdata.latest()
-    try:
-        # Get fresh Sim Data
-        sc.receive(timeout_seconds=0.01)
-    except:
-        pass
-    simvarsChanged = (len(simvars.simdata.changedsince(latest)) != 0)
-    # USB io is faster than Simconnect, therefor repeat 5 times
-    for i in range(5):
-        # Process USB devices one by one
+                    self.output_io("Led3", 0)
+                    self.blink_off("Led3")
+                # Altitude Hold Mode
+                if simvars.simdata["AUTOPILOT ALTITUDE LOCK"]: self.output_io("Led4", 1)
+                else: self.output_io("Led4", 0)
+                # Altitude Arm
+                if simvars.simdata["AUTOPILOT ALTITUDE ARM"]: self.output_io("Led4", 1)
+                else: self.output_io("Led4", 0)
+                # Vertical Speed engage
+                if simvars.simdata["AUTOPILOT VERTICAL HOLD"]: self.output_io("Led5", 1)
+                else: self.output_io("Led5", 0)
+                # displays are blank unless selected, unchanged rows are not rendered or written again.
+                # The displayed values are FAST simvars, which may not have arrived yet and stay blank until then
+                top = bottom = None
+                # Altitude and Vertical Speed Display
+                if state.select==0 or state.select==1:
+                    top = simvars.simdata.get("AUTOPILOT ALTITUDE LOCK VAR")
+                    if simvars.simdata["AUTOPILOT VERTICAL HOLD"]:
+                        bottom = simvars.simdata.get("AUTOPILOT VERTICAL HOLD VAR")
+                # Heading Display
+                if state.select==3:
+                    self.display("Top", simvars.simdata.get("AUTOPILOT HEADING LOCK DIR"), SAITEK_UNITS)
+                else:
+                    self.display("Top", top)
+                self.display("Bottom", bottom)
+
+        # State holds the selected display mode
+        SaitekAP = USBSimDevice(0x06a3, 0x0d06, 0, METH.READ_ALL | METH.WRITE_FEATURE, state=dict(select=0))
+        SaitekAP.name = "SaitekAP"
+        SaitekAP.set_inputs( [IO("DispALT", 0,0), IO("DispVS",  0,1), IO("DispIAS", 0,2), IO("DispHDG", 0,3), IO("DispCRS", 0,4), IO("TurnCW", 0,5), IO("TurnCCW", 0,6), IO("B0", 0,7),
+                              IO("B1",      1,0), IO("B2",      1,1), IO("B3",      1,2), IO("B4",      1,3), IO("B5",      1,4), IO("B6",     1,5), IO("B7",      1,6), IO("Arm", 1,7),
+                              IO("FlUP",    2,0), IO("FlDN",    2,1), IO("TrUP",    2,2), IO("TrDN",    2,3)])
+        SaitekAP.set_outputs([IO("Led0",  11,0), IO("Led1", 11,1), IO("Led2", 11,2), IO("Led3", 11,3), IO("Led4", 11,4), IO("Led5", 11,5), IO("Led6", 11,6), IO("Led7", 11,7)])
+        SaitekAP.set_displays([Display("Top", 1, SAITEK_HUNDREDS), Display("Bottom", 6, SAITEK_HUNDREDS)])
+        SaitekAP.set_actions(ActionSaitekAP)
+        SaitekAP.set_simvars(['AUTOPILOT MASTER', 'AUTOPILOT HEADING LOCK', 'AUTOPILOT NAV1 LOCK', 'AUTOPILOT APPROACH HOLD',
+                              'AUTOPILOT ALTITUDE LOCK', 'AUTOPILOT ALTITUDE ARM', 'AUTOPILOT VERTICAL HOLD', 'AUTOPILOT APPROACH CAPTURED'], RATE.ONCHANGE)
+        SaitekAP.set_simvars(['AUTOPILOT VERTICAL HOLD VAR', 'AUTOPILOT ALTITUDE LOCK VAR', 'AUTOPILOT HEADING LOCK DIR'], RATE.FAST)
+        SaitekAP.output([1, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,  0, 0])
+
+    # Hardwaredefinition Saitek Switch Panel
+
+    if Activate.get("SaitekSW"):
+
+        def ActionSaitekSW(self):
+            pass
+
+        SaitekSW = USBSimDevice(0x06a3, 0x0d05, 0,METH.READ | METH.WRITE)
+        SaitekSW.name = "SaitekSW"
+        SaitekSW.set_outputs([IO("Green N", 0,0), IO("Green L", 0,1), IO("Green R",  0,2), IO("Red N",     0,3), IO("Red L",   0,4), IO("Red R", 0,5)])
+        SaitekSW.set_inputs([ IO("BAT",     0,0), IO("ALT",     0,1), IO("AVIONICS", 0,2), IO("FUEL",      0,3), IO("DE-ICE",  0,4), IO("PITOT", 0,5), IO("COWL", 0,6), IO("PANEL", 0,7),
+                              IO("BEACON",  1,0), IO("NAV",     1,1), IO("STROBE",   1,2), IO("TAXI",      1,3), IO("LANDING", 1,4), IO("OFF",   1,5), IO("R",    1,6), IO("L",     1,7),
+                              IO("BOTH",    2,0), IO("START",   2,1), IO("GEAR UP",  2,2), IO("GEAR DOWN", 2,3)])
+        SaitekSW.set_actions(ActionSaitekSW)
+        SaitekSW.set_poll(PRIO.LOW)
+        SaitekSW.output([ 7])
+
+    # Hardwaredefinition CH Flightstick Gameport using noname converter, see profiles/CHflight.json
+
+    if Activate.get("CHflight"):
+        Profiles.append(os.path.join(PROFILE_DIR, 'CHflight.json'))
+
+    # Devices defined by profiles, actions are imported once a device is connected. With -Shards, they
+    # run in processes of their own, started after connecting to SimConnect
+
+    if Shards:
+        import USBSimShard
+        ShardSpecs = USBSimShard.split(Profiles, Shards)
+    else:
+        USBSimProfile.create_all(Profiles)
+
+    # Hardwaredefinition add your Hardware here
+
+    '''
+    if Activate.get("XXX"):
+
+        def ActionXXX(self):
+            pass
+
+        XXX = USBSimDevice(0x17b5, 0x0010, 0,METH.READ)
+        XXX.name = "XXX"
+        XXX.set_inputs([IO("LR", 0,16), IO("UD", 2,16)])
+        XXX.set_actions(ActionXXX)
+    '''
+
+    #######################
+    ##### Main Loop #######
+    #######################
+
+    # Optional metrics of all devices
+    if Metrics:
+        import USBSimMetrics
         for worker in USBSimDevice.Workers:
-            worker.update()
-            worker.actions()
-        # Minimum wait time
-        sleep(0.001)
\ No newline at end of file
+            worker.enable_metrics()
+        USBSimMetrics.start_dump(USBSimDevice.Workers, Metrics)
+
+    # Optional profiling of actions and updates, every 10th call sampled with cProfile
+    if Budget:
+        import atexit
+        import USBSimProfiler
+        profiler = USBSimProfiler.enable(USBSimDevice.Workers, budget=Budget / 1000, sample=10)
+        atexit.register(lambda: print(profiler.report(), file=sys.stderr))
+
+    # Optional latency tracing, exported as Chrome trace when the program ends
+    if Trace:
+        import atexit
+        import USBSimTrace
+        atexit.register(USBSimTrace.enable().export, Trace)
+
+    # Optional SimConnect stand-in, all simvars wander randomly. pysimconnect is only needed without it
+    if Standin:
+        import atexit
+        import USBSimStandin
+        from USBSimStandin import PERIOD_VISUAL_FRAME, PERIOD_SECOND, DATA_REQUEST_FLAG_CHANGED, DATA_REQUEST_FLAG_TAGGED
+        def SimConnect():
+            standin = USBSimStandin.StandinSimConnect(default=USBSimStandin.RandomWalk(0, 1, 0.2, rate=2.0))
+            atexit.register(lambda: print(json.dumps(standin.stats()), file=sys.stderr))
+            return standin
+    else:
+        from simconnect import SimConnect, PERIOD_VISUAL_FRAME, PERIOD_SECOND, DATA_REQUEST_FLAG_CHANGED, DATA_REQUEST_FLAG_TAGGED
+
+    # Subscription periods per rate class of simvars, from the most to the least frequent, see set_simvars().
+    # The interval is the number of periods skipped between two sends: on change simvars are checked every
+    # frame, FAST every 10th frame, about the rate of the single subscription used before, NORMAL every 30th
+    # frame and SLOW every second.
+    # All are only sent by the sim when a value changed, tagged so only the changed values are transferred,
+    # which are the defaults of pysimconnect.
+    ON_CHANGE = DATA_REQUEST_FLAG_CHANGED | DATA_REQUEST_FLAG_TAGGED
+    SIMVAR_PERIODS = {RATE.ONCHANGE: dict(period=PERIOD_VISUAL_FRAME, interval=0, flags=ON_CHANGE),
+                      RATE.FAST:     dict(period=PERIOD_VISUAL_FRAME, interval=9, flags=ON_CHANGE),
+                      RATE.NORMAL:   dict(period=PERIOD_VISUAL_FRAME, interval=29, flags=ON_CHANGE),
+                      RATE.SLOW:     dict(period=PERIOD_SECOND, interval=0, flags=ON_CHANGE)}
+
+    def openSimConnect():
+        global simvars, sc
+        try:
+            # events of all actions are sent once per frame by sc.flush()
+            sc = EventDispatcher(SimConnect())
+            # with shards, subscribe their simvars as well
+            simvars = USBSimSimvars.subscribe(sc, SIMVAR_PERIODS, USBSimShard.simvar_groups(ShardSpecs) if Shards else None)
+            USBSimProfile.connect(sc, simvars.simdata)
+            return True
+        except:
+            return False
+
+    # Try to connect to SimConnect, waiting longer after each failed attempt
+    retry = USBSimDevice.RECONNECT_MIN
+    while not openSimConnect():
+        sleep(retry)
+        retry = min(retry * 2, USBSimDevice.RECONNECT_MAX)
+    # Shard processes, the coordinator distributes simvars and sends their events
+    if Shards:
+        setup = None
+        if Hidraw:
+            from functools import partial
+            setup = partial(USBSimShard.use_backend, 'USBSimHidraw')
+        coordinator = USBSimShard.Coordinator(sc, simvars, ShardSpecs, threaded=Threaded, setup=setup)
+        coordinator.start()
+        # stop the shards and release and unlink their shared memory at exit
+        import atexit
+        atexit.register(coordinator.stop)
+        shards_due = monotonic()
+        def sync_shards(changed):
+            global shards_due
+            coordinator.distribute(changed)
+            coordinator.collect()
+            if Metrics and monotonic() >= shards_due:
+                # status of the shard devices from shared memory, next to the metrics of this process
+                shards_due = monotonic() + Metrics
+                print(json.dumps({"shards": coordinator.status()}), file=sys.stderr)
+    # Poll intervals adapted per device
+    if Adaptive:
+        import USBSimScheduler
+        scheduler = USBSimScheduler.PollScheduler()
+    # One epoll set for all devices opened by the hidraw backend
+    if Hidraw:
+        poller = USBSimHidraw.Poller()
+    # Update all devices and run the actions of the triggered ones, optionally decoding all inputs at once
+    if Vectorized:
+        import USBSimMatrix
+        if not USBSimMatrix.AVAILABLE:
+            parser.error('-Vectorized needs NumPy')
+        run_workers = USBSimMatrix.ReportMatrix().step
+    else:
+        def run_workers():
+            for worker in USBSimDevice.Workers:
+                worker.update()
+                if worker.triggered():
+                    worker.actions()
+    # Alternative main loop driven by asyncio
+    if Async:
+        import USBSimAsync
+        # events are flushed by the scheduler right after the actions, those of the shards after sync_shards
+        USBSimAsync.run(sc, simvars, on_frame=sync_shards if Shards else None)
+    # Main        
+    while True:
+
+        # Get Simconnect Data
+        latest = simvars.simdata.latest()
+        try:
+            # Get fresh Sim Data, in threaded and hidraw mode waiting is done for the devices
+            sc.receive(timeout_seconds=0 if Threaded or Hidraw or Adaptive else 0.01)
+        except:
+            pass
+        # Hand changed simvars to the devices using them
+        changed = simvars.simdata.changedsince(latest)
+        USBSimDevice.dispatch_simvars(changed)
+        if Shards:
+            # simvars to the shards, their events are sent with those of this process at sc.flush()
+            sync_shards(changed)
+        if Threaded:
+            # Process USB devices once, then sleep until a device has data or Simconnect is due again
+            run_workers()
+            sc.flush()
+            USBSimDevice.wait(0.01)
+            continue
+        if Hidraw:
+            # Process USB devices once, devices without pending reports are not read. Then wait in one epoll call
+            # until any device has data or Simconnect is due again
+            run_workers()
+            sc.flush()
+            poller.wait(0.01)
+            continue
+        if Adaptive:
+            # Update each device when due until Simconnect is due again
+            scheduler.run_for(0.01)
+            sc.flush()
+            continue
+        # USB io is faster than Simconnect, therefor repeat 5 times
+        for i in range(5):
+            # Process USB devices
+            run_workers()
+            # Minimum wait time
+            sleep(0.001)
+        # Send the events of this frame
+        sc.flush()
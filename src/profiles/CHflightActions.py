@@ -0,0 +1,31 @@
+""" =============================================================================================
+CHflightActions
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Actions of the CH Flightstick on a noname gameport converter, see CHflight.json.
+=============================================================================================="""
+
+from USBSimProfile import sim
+
+
+def ActionCHflight(self):
+    # process buttons
+    ins = self.input_ios()
+    if ins["Buttons"]==1:    pass # B1
+    elif ins["Buttons"]==4:  pass # B2
+    elif ins["Buttons"]==5:  pass # B3
+    elif ins["Buttons"]==9:  pass # B4
+    elif ins["Buttons"]==8:  pass # B5
+    elif ins["Buttons"]==2:  pass # B6
+    elif ins["Buttons"]==14: pass # Hat 1 Up
+    elif ins["Buttons"]==10: pass # Hat 1 Right
+    elif ins["Buttons"]==6:  pass # Hat 1 Down
+    elif ins["Buttons"]==12: pass # Hat 1 Left
+    elif ins["Buttons"]==15: pass # Hat 2 Up
+    elif ins["Buttons"]==11: pass # Hat 2 Right
+    elif ins["Buttons"]==7:  pass # Hat 2 Down
+    elif ins["Buttons"]==3:  pass # Hat 2 Left
+    # set axis, calibrated and filtered as defined in the profile
+    if ins["Elevator"] is not False: sim.send_event('ELEVATOR_SET', ins["Elevator"])
+    if ins["Aileron"] is not False: sim.send_event('AILERON_SET', ins["Aileron"])
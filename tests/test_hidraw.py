@@ -0,0 +1,169 @@
+""" =============================================================================================
+test_hidraw
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Tests of USBSimHidraw against named pipes standing in for /dev/hidraw nodes: readinto() of
+HidrawDevice and the readable flag the Poller sets on the devices.
+
+    python -m unittest discover tests
+=============================================================================================="""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+if os.name == 'posix':
+    import USBSimHidraw
+
+
+class Pipe:
+    """Named pipe opened by a HidrawDevice like a hidraw node, reports are written to its other end.
+    """
+    def __init__(self, directory, name):
+        self.path = os.path.join(directory, name)
+        os.mkfifo(self.path)
+        self.device = USBSimHidraw.device()
+        self.device.open_path(self.path)
+        self.writer = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+
+    def send(self, report):
+        os.write(self.writer, bytes(report))
+
+    def close(self):
+        os.close(self.writer)
+        self.device.close()
+
+
+class Worker:
+    """The parts of USBSimDevice used by the Poller.
+    """
+    STAT_OK = 1
+
+    def __init__(self, dev):
+        self.dev = dev
+        self.status = Worker.STAT_OK
+        self._reader = None
+        self.readable = None
+
+
+@unittest.skipUnless(os.name == 'posix', "hidraw is only available on Linux")
+class HidrawTestCase(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.pipes = []
+
+    def tearDown(self):
+        for pipe in self.pipes:
+            pipe.close()
+        self._directory.cleanup()
+
+    def pipe(self, name="hidraw0"):
+        pipe = Pipe(self._directory.name, name)
+        self.pipes.append(pipe)
+        return pipe
+
+
+class TestReadinto(HidrawTestCase):
+    def test_report_is_read_into_buffer(self):
+        pipe = self.pipe()
+        pipe.device.set_nonblocking(1)
+        pipe.send([1, 2, 3])
+        buffer = bytearray(64)
+        self.assertEqual(pipe.device.readinto(buffer), 3)
+        self.assertEqual(buffer[:3], b'\x01\x02\x03')
+
+    def test_nonblocking_without_report_returns_0(self):
+        # os.readv raises BlockingIOError on the empty non-blocking descriptor
+        pipe = self.pipe()
+        pipe.device.set_nonblocking(1)
+        self.assertEqual(pipe.device.readinto(bytearray(64)), 0)
+
+    def test_timeout_without_report_returns_0(self):
+        pipe = self.pipe()
+        self.assertEqual(pipe.device.readinto(bytearray(64), timeout_ms=10), 0)
+
+    def test_blocking_read_with_report_pending(self):
+        pipe = self.pipe()
+        pipe.send([7])
+        self.assertEqual(pipe.device.readinto(bytearray(64)), 1)
+
+    def test_readinto_memoryview(self):
+        pipe = self.pipe()
+        pipe.device.set_nonblocking(1)
+        pipe.send([4, 5])
+        buffer = bytearray(8)
+        self.assertEqual(pipe.device.readinto(memoryview(buffer)[2:]), 2)
+        self.assertEqual(buffer, b'\x00\x00\x04\x05\x00\x00\x00\x00')
+
+    def test_read_returns_bytes(self):
+        pipe = self.pipe()
+        pipe.device.set_nonblocking(1)
+        pipe.send([9, 8])
+        self.assertEqual(pipe.device.read(64), b'\x09\x08')
+        self.assertEqual(pipe.device.read(64), b'')
+
+    def test_closed_device_raises(self):
+        pipe = self.pipe()
+        pipe.device.close()
+        with self.assertRaises(OSError):
+            pipe.device.readinto(bytearray(64))
+
+
+class TestPoller(HidrawTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = Worker(self.pipe("hidraw0").device)
+        self.second = Worker(self.pipe("hidraw1").device)
+        self.poller = USBSimHidraw.Poller([self.first, self.second])
+
+    def tearDown(self):
+        self.poller.close()
+        super().tearDown()
+
+    def test_only_device_with_report_is_readable(self):
+        self.pipes[0].send([1])
+        self.assertEqual(self.poller.wait(0.1), [self.first])
+        self.assertIs(self.first.readable, True)
+        self.assertIs(self.second.readable, False)
+
+    def test_no_device_readable_after_timeout(self):
+        self.assertEqual(self.poller.wait(0.01), [])
+        self.assertIs(self.first.readable, False)
+        self.assertIs(self.second.readable, False)
+
+    def test_readable_until_report_is_read(self):
+        self.pipes[1].send([1])
+        self.poller.wait(0.1)
+        self.assertIs(self.second.readable, True)
+        self.second.dev.readinto(bytearray(64))
+        self.poller.wait(0)
+        self.assertIs(self.second.readable, False)
+
+    def test_disconnected_device_is_read_at_every_update(self):
+        self.poller.wait(0)
+        self.first.status = 0
+        self.poller.wait(0)
+        self.assertIsNone(self.first.readable)
+        self.assertIs(self.second.readable, False)
+
+    def test_device_with_reader_thread_is_not_registered(self):
+        self.first._reader = object()
+        self.pipes[0].send([1])
+        self.assertEqual(self.poller.wait(0.01), [])
+        self.assertIsNone(self.first.readable)
+
+    def test_close_unregisters_devices(self):
+        self.poller.wait(0)
+        self.poller.close()
+        self.assertIsNone(self.first.readable)
+        self.assertIsNone(self.second.readable)
+        # closing again in tearDown must not fail
+        self.poller = USBSimHidraw.Poller([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+""" =============================================================================================
+test_profiler
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Tests of the text report of USBSimProfiler for devices with timed and only sampled calls.
+
+    python -m unittest discover tests
+=============================================================================================="""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import USBSimProfiler
+
+
+class Device:
+    """The parts of USBSimDevice used by the Profiler.
+    """
+    def __init__(self, name="Test"):
+        self.vendor_id = 0x1234
+        self.product_id = 0x5678
+        self.interface = 0
+        self.name = name
+        self.profiling = None
+        self.calls = 0
+
+    def actions(self):
+        self.calls += 1
+
+
+class TestReport(unittest.TestCase):
+    def profile(self, sample):
+        self.device = Device()
+        return USBSimProfiler.Profiler(budget=1.0, sample=sample, out=io.StringIO())
+
+    def test_only_sampled_calls(self):
+        profiler = self.profile(sample=1)
+        profiler.attach(self.device)
+        self.device.actions()
+        report = profiler.report()
+        self.assertEqual(self.device.calls, 1)
+        self.assertIn("actions: 1 sampled\n", report)
+        self.assertNotIn("None", report)
+
+    def test_timed_calls(self):
+        profiler = self.profile(sample=0)
+        profiler.attach(self.device)
+        self.device.actions()
+        self.device.actions()
+        report = profiler.report()
+        self.assertIn("actions: 2 calls, mean ", report)
+        self.assertIn("0 slow, 0 sampled\n", report)
+
+    def test_no_calls(self):
+        profiler = self.profile(sample=1)
+        profiler.attach(self.device)
+        self.assertEqual(profiler.report(), "=== 1234:5678:0#0 Test\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+""" =============================================================================================
+test_shard
+=================================================================================================
+v1.0 / 16.10.2026 (cc) AkaTecker
+
+Tests of USBSimShard: starting a Coordinator before SimConnect has sent the values of the
+simvars of its shards, and the wrapping counters of the device blocks in shared memory.
+
+    python -m unittest discover tests
+=============================================================================================="""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import USBSimShard
+    from USBSimSimvars import MergedSimdata
+except ImportError:
+    USBSimShard = None
+
+PROFILE = {"name": "Test", "vendor_id": "0x1234", "product_id": "0x5678", "default": 8,
+           "simvars": {"NORMAL": ["A"], "SLOW": ["B"]}}
+
+
+class Subscription:
+    """Merged subscription of pysimconnect, before any value has arrived.
+    """
+    def __init__(self, parts):
+        self.simdata = MergedSimdata(parts)
+
+
+@unittest.skipUnless(USBSimShard is not None, "USBSimDevice needs the hid module")
+class TestCoordinator(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self._directory.name, "test.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(PROFILE, f)
+        self.shards = USBSimShard.split([path], 1)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_simvars_without_value_are_not_contained(self):
+        normal = {}
+        simdata = MergedSimdata([(normal, ["A"]), ({}, ["B"])])
+        self.assertNotIn("A", simdata)
+        self.assertIsNone(simdata.get("A"))
+        normal["A"] = 1.0
+        self.assertIn("A", simdata)
+        self.assertNotIn("C", simdata)
+
+    def test_start_with_empty_simdata(self):
+        coordinator = USBSimShard.Coordinator(None, Subscription([({}, ["A"]), ({}, ["B"])]), self.shards)
+        try:
+            coordinator.start()
+            coordinator.distribute(["A", "B"])
+            self.assertEqual(coordinator.collect(0), 0)
+        finally:
+            coordinator.stop()
+
+
+@unittest.skipUnless(USBSimShard is not None, "USBSimDevice needs the hid module")
+class TestSharedDevice(unittest.TestCase):
+    def setUp(self):
+        self.buf = bytearray(USBSimShard.BLOCK.size)
+        self.shard = USBSimShard.SharedDevice(memoryview(self.buf), 0, "Test")
+
+    def view(self):
+        return USBSimShard.SharedDevice(memoryview(self.buf), 0, "Test")
+
+    def test_counts_since_view_was_created(self):
+        self.shard.count_input()
+        coordinator = self.view()
+        self.shard.count_input()
+        self.shard.count_output()
+        self.assertEqual(coordinator.counts(), (1, 1))
+
+    def test_counters_wrap_around(self):
+        USBSimShard.COUNTER.pack_into(self.buf, 0, USBSimShard.COUNTER_MASK - 1)
+        coordinator = self.view()
+        for _ in range(3):
+            self.shard.count_input()
+        self.assertEqual(USBSimShard.COUNTER.unpack_from(self.buf, 0)[0], 1)
+        self.assertEqual(coordinator.counts(), (3, 0))
+        self.shard.count_input()
+        self.assertEqual(coordinator.counts(), (4, 0))
+
+    def test_status(self):
+        self.shard.publish_status(2)
+        self.assertEqual(self.view().status, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()